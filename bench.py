@@ -0,0 +1,171 @@
+"""Scalable benchmark suite for the simulation tick and the render frame.
+
+Builds worlds at configurable entity counts, times World.step() per tick
+and (with --render) render.render_frame() per frame, and prints one JSON
+object per scenario/phase with percentiles, so regressions show up as numbers.
+
+    python bench.py                                   # update() only, all presets; numpy AI past 1000 enemies
+    python bench.py --scenario x100 --enemy-ai objects   # force the per-object AI
+    python bench.py --scenario baseline --scenario x10 --out bench.jsonl
+    python bench.py --custom 500,2000,100,20000       # enemies,foods,plants,bubbles
+    xvfb-run -a python bench.py --render              # + frames on Mesa via a GLUT window
+    python bench.py --render --gl osmesa              # + frames on an OSMesa context (no HUD)
+    python bench.py --render --capture /dev/null --capture-ring 0   # readback cost, sync vs PBO ring
+"""
+import json, os, sys, time
+import numpy as np
+
+# name: (enemies, foods, plants, bubbles); baseline is the shipped game.
+SCENARIOS = {
+    "baseline": (14, 30, 25, 260),
+    "x10":      (140, 300, 250, 2600),
+    "x100":     (1400, 3000, 1000, 26000),
+    "10k":      (10000, 10000, 2500, 100000),
+}
+PERCENTILES = (50, 90, 99)
+# The per-object enemy AI takes about a second a tick at 10k enemies, so
+# by default bigger schools run on the array backend (swarm.py).
+OBJECTS_MAX = 1000
+
+def build_world(counts, seed, enemy_ai="objects"):
+    from world import World, HALF
+    from replay import scripted_input
+    n_enemies, n_foods, n_plants, n_bubbles = counts
+    w = World(seed=seed, input_source=scripted_input(seed), target_foods=n_foods,
+              n_enemies=n_enemies, n_plants=n_plants, bubble_cap=n_bubbles, enemy_ai=enemy_ai)
+    w.hero.cheat = True  # a dead hero stops the sim, and we want every tick to do work
+    # Top the bubble pool up to its cap instead of waiting for it to fill.
+    k = n_bubbles - len(w.bubbles)
+    if k > 0:
+        rng = w.bubbles.rng
+        w.bubbles.spawn_many(rng.uniform(-HALF*0.9, HALF*0.9, k), rng.uniform(-HALF*0.9, HALF*0.9, k),
+                             rng.uniform(4.0, 400.0, k))
+    return w
+
+def summarize(samples):
+    ms = np.asarray(samples) * 1000.0
+    out = {"n": int(ms.size), "mean_ms": round(float(ms.mean()), 4), "max_ms": round(float(ms.max()), 4)}
+    for p, v in zip(PERCENTILES, np.percentile(ms, PERCENTILES)):
+        out[f"p{p}_ms"] = round(float(v), 4)
+    return out
+
+def time_updates(world, ticks, warmup):
+    for _ in range(warmup):
+        world.step()
+    samples = []
+    clock = time.perf_counter
+    for _ in range(ticks):
+        t0 = clock()
+        world.step()
+        samples.append(clock() - t0)
+    return samples
+
+# ---------------- Render ----------------
+def init_gl(backend):
+    """Make a current GL context and return the render module to draw with."""
+    if backend == "osmesa":
+        os.environ["PYOPENGL_PLATFORM"] = "osmesa"
+    import render as game
+    from OpenGL import GL
+    if backend == "osmesa":
+        from OpenGL import osmesa, arrays
+        ctx = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+        buf = arrays.GLubyteArray.zeros((game.WIN_H, game.WIN_W, 4))
+        if not osmesa.OSMesaMakeCurrent(ctx, buf, GL.GL_UNSIGNED_BYTE, game.WIN_W, game.WIN_H):
+            raise SystemExit("OSMesaMakeCurrent failed")
+        init_gl.keep = (ctx, buf)  # keep the context and its buffer alive
+    else:
+        from OpenGL import GLUT
+        GLUT.glutInit(sys.argv[:1])
+        GLUT.glutInitDisplayMode(GLUT.GLUT_DOUBLE | GLUT.GLUT_RGB | GLUT.GLUT_DEPTH)
+        GLUT.glutInitWindowSize(game.WIN_W, game.WIN_H)
+        GLUT.glutCreateWindow(b"fish tank bench")
+    game.initGL()
+    game.build_sand()
+    return game
+
+def time_frames(game, world, frames, warmup, hud, cap=None):
+    from OpenGL.GL import glFinish
+    game.world = world
+    for _ in range(warmup):
+        world.step()
+        game.render_frame(hud)
+    glFinish()
+    samples = []
+    clock = time.perf_counter
+    for _ in range(frames):
+        world.step()
+        t0 = clock()
+        game.render_frame(hud)
+        if cap is not None:
+            cap.grab()
+        glFinish()  # count the GPU/Mesa work, not just command submission
+        samples.append(clock() - t0)
+    return samples
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="Benchmark World.step() and render_frame() at scale.")
+    ap.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                    help="preset to run (repeatable; default: all)")
+    ap.add_argument("--custom", action="append", default=[], metavar="E,F,P,B",
+                    help="extra scenario as enemies,foods,plants,bubbles")
+    ap.add_argument("--ticks", type=int, default=600)
+    ap.add_argument("--frames", type=int, default=120)
+    ap.add_argument("--warmup", type=int, default=30)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--enemy-ai", choices=("auto", "objects", "numpy"), default="auto",
+                    help="enemy AI backend (see swarm.py); auto picks numpy above --objects-max")
+    ap.add_argument("--objects-max", type=int, default=OBJECTS_MAX,
+                    help="with --enemy-ai auto, the most enemies run on the per-object backend")
+    ap.add_argument("--render", action="store_true", help="also time render_frame()")
+    ap.add_argument("--gl", choices=("glut", "osmesa"), default="glut",
+                    help="context for --render: a GLUT window (use xvfb-run for Mesa) or OSMesa")
+    ap.add_argument("--capture", metavar="PATH",
+                    help="with --render, also capture every frame to PATH (see capture.py)")
+    ap.add_argument("--capture-ring", type=int, default=3,
+                    help="PBOs in the capture ring; 0 reads back synchronously")
+    ap.add_argument("--out", help="append JSON lines here instead of stdout")
+    args = ap.parse_args(argv)
+
+    runs = [(name, SCENARIOS[name]) for name in (args.scenario or SCENARIOS)]
+    for spec in args.custom:
+        counts = tuple(int(c) for c in spec.split(","))
+        if len(counts) != 4:
+            ap.error(f"--custom wants 4 counts, got {spec!r}")
+        runs.append(("custom", counts))
+
+    game = init_gl(args.gl) if args.render else None
+    out = open(args.out, "a") if args.out else sys.stdout
+    try:
+        for name, counts in runs:
+            enemy_ai = args.enemy_ai
+            if enemy_ai == "auto":
+                enemy_ai = "objects" if counts[0] <= args.objects_max else "numpy"
+            base = {"scenario": name, "enemies": counts[0], "foods": counts[1],
+                    "plants": counts[2], "bubbles": counts[3], "seed": args.seed,
+                    "enemy_ai": enemy_ai}
+            world = build_world(counts, args.seed, enemy_ai)
+            stats = summarize(time_updates(world, args.ticks, args.warmup))
+            print(json.dumps({**base, "phase": "update", **stats}), file=out, flush=True)
+            if game is not None:
+                world = build_world(counts, args.seed, enemy_ai)
+                cap = None
+                if args.capture:
+                    from capture import FrameCapture
+                    cap = FrameCapture(args.capture, game.WIN_W, game.WIN_H, ring=args.capture_ring)
+                samples = time_frames(game, world, args.frames, args.warmup,
+                                      hud=args.gl != "osmesa", cap=cap)
+                issued, filtered = game.gl_state.last   # state calls in a steady-state frame
+                extra = {"gl_state_calls": issued, "gl_state_filtered": filtered}
+                if cap is not None:
+                    cap.close()
+                    extra.update(capture_ring=args.capture_ring, dropped=cap.dropped, capture_fps=cap.fps())
+                print(json.dumps({**base, "phase": "render", "gl": args.gl, **extra,
+                                  **summarize(samples)}), file=out, flush=True)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()
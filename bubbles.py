@@ -0,0 +1,194 @@
+"""Structure-of-arrays bubble pool.
+
+Every bubble lives in a slot of a set of parallel NumPy arrays, and the whole
+pool is advanced with one vectorised step (rise, wobble, wall clamp and the
+respawn-at-the-top logic for all three sources). No OpenGL in here.
+
+Only the newest `hot` bubbles are drawn, so only those are stepped every
+tick. The rest are cold: each slot remembers the pool time it was last
+advanced to (`t`) and every COLD_EVERY ticks all cold slots catch up in one
+pass, rising in a straight line and integrating the wobble analytically.
+"""
+import math, time
+import numpy as np
+
+from tank import HALF, TOP_Z
+
+# Source codes stored in BubblePool.src
+SRC_RANDOM, SRC_PLANT, SRC_BUBBLER = 0, 1, 2
+SOURCES = {'random': SRC_RANDOM, 'plant': SRC_PLANT, 'bubbler': SRC_BUBBLER}
+
+# Respawn jitter around the origin, indexed by source code. 'random' bubbles
+# respawn anywhere in the middle 90% of the tank, so their origin is (0, 0).
+RESPAWN_SPREAD = np.array([HALF*0.9, 6.0, 2.5])
+
+WALL_MARGIN = 8.0
+POP_Z = TOP_Z - 10.0
+COLD_EVERY = 10   # ticks between catch-up passes over the undrawn bubbles
+
+class BubblePool:
+    FIELDS = ("x", "y", "z", "v", "r", "phase", "ox", "oy", "t")
+
+    def __init__(self, capacity=256, rng=None, hot=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.n = 0
+        self.hot = hot   # newest slots stepped every tick; None steps them all
+        self.clock = 0.0
+        self.ticks = 0
+        self.allocations = 0   # times the arrays were (re)allocated
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        old_n = self.n
+        for name in self.FIELDS:
+            a = np.zeros(capacity)
+            if old_n:
+                a[:old_n] = getattr(self, "_" + name)[:old_n]
+            setattr(self, "_" + name, a)
+        src = np.zeros(capacity, dtype=np.int8)
+        if old_n:
+            src[:old_n] = self._src[:old_n]
+        self._src = src
+        self.capacity = capacity
+        self.allocations += 1
+
+    def __len__(self):
+        return self.n
+
+    def clear(self):
+        self.n = 0
+
+    def reset(self, rng=None):
+        """Empty the pool and restart its clock, keeping the arrays."""
+        if rng is not None:
+            self.rng = rng
+        self.n = 0
+        self.clock = 0.0
+        self.ticks = 0
+
+    # Live views (no copies) onto the first n slots.
+    x = property(lambda self: self._x[:self.n])
+    y = property(lambda self: self._y[:self.n])
+    z = property(lambda self: self._z[:self.n])
+    v = property(lambda self: self._v[:self.n])
+    r = property(lambda self: self._r[:self.n])
+    phase = property(lambda self: self._phase[:self.n])
+    ox = property(lambda self: self._ox[:self.n])
+    oy = property(lambda self: self._oy[:self.n])
+    t = property(lambda self: self._t[:self.n])
+    src = property(lambda self: self._src[:self.n])
+
+    def spawn_many(self, x, y, z, source='random', ox=None, oy=None):
+        """Append len(x) bubbles; speed, radius and phase are rolled here."""
+        x = np.asarray(x, dtype=float); y = np.asarray(y, dtype=float)
+        k = x.size
+        if k == 0:
+            return
+        if self.n + k > self.capacity:
+            self._alloc(max(self.capacity*2, self.n + k))
+        s = slice(self.n, self.n + k)
+        rng = self.rng
+        self._x[s] = x
+        self._y[s] = y
+        self._z[s] = z
+        self._v[s] = rng.uniform(24, 44, k)  # rise speed
+        self._r[s] = rng.uniform(2.0, 5.0, k)
+        self._phase[s] = rng.random(k)*math.tau
+        self._src[s] = SOURCES[source]
+        self._ox[s] = x if ox is None else ox
+        self._oy[s] = y if oy is None else oy
+        self._t[s] = self.clock
+        self.n += k
+
+    def spawn(self, x, y, z=8.0, source='random', ox=None, oy=None):
+        self.spawn_many([x], [y], z, source, ox, oy)
+
+    def tail(self, count):
+        """Positions and radii of the `count` most recently spawned bubbles."""
+        s = slice(max(0, self.n - count), self.n)
+        return self._x[s], self._y[s], self._z[s], self._r[s]
+
+    def step(self, dt):
+        self.clock += dt
+        self.ticks += 1
+        n = self.n
+        cold = 0 if self.hot is None else max(0, n - self.hot)
+        self._rise(slice(cold, n))
+        if cold and self.ticks % COLD_EVERY == 0:
+            self._drift(slice(0, cold))
+
+    def catch_up(self):
+        """Bring every cold slot up to the pool clock now."""
+        cold = 0 if self.hot is None else max(0, self.n - self.hot)
+        if cold:
+            self._drift(slice(0, cold))
+
+    def _rise(self, s):
+        """The per-tick step: explicit Euler on the rise and the wobble."""
+        dt = self.clock - self._t[s]
+        self._t[s] = self.clock
+        x, y, z = self._x[s], self._y[s], self._z[s]
+        phase = self._phase[s]
+        z += self._v[s] * dt
+        x += np.sin(z*0.02 + phase)*4.0*dt*10
+        y += np.cos(z*0.018 + phase)*4.0*dt*10
+        self._settle(s, x, y, z)
+
+    def _drift(self, s):
+        """Catch-up step for cold slots over however long they have slept.
+
+        z is linear in time between respawns, so the wobble integrates
+        exactly: x' = 40 sin(0.02 z + phase) gives
+        x1 - x0 = 2000/v * (cos(0.02 z0 + phase) - cos(0.02 z1 + phase)).
+        """
+        dt = self.clock - self._t[s]
+        self._t[s] = self.clock
+        x, y, z = self._x[s], self._y[s], self._z[s]
+        v, phase = self._v[s], self._phase[s]
+        z0 = z.copy()
+        z += v * dt
+        x += (np.cos(z0*0.02 + phase) - np.cos(z*0.02 + phase)) * (2000.0 / v)
+        y += (np.sin(z*0.018 + phase) - np.sin(z0*0.018 + phase)) * (40.0/0.018 / v)
+        self._settle(s, x, y, z)
+
+    def _settle(self, s, x, y, z):
+        """Wall clamp, and respawn whatever rose past the top of the tank."""
+        np.clip(x, -HALF+WALL_MARGIN, HALF-WALL_MARGIN, out=x)
+        np.clip(y, -HALF+WALL_MARGIN, HALF-WALL_MARGIN, out=y)
+
+        popped = np.flatnonzero(z > POP_Z)
+        k = popped.size
+        if k:
+            rng = self.rng
+            src = self._src[s][popped]
+            spread = RESPAWN_SPREAD[src]
+            is_random = src == SRC_RANDOM
+            cx = np.where(is_random, 0.0, self._ox[s][popped])
+            cy = np.where(is_random, 0.0, self._oy[s][popped])
+            z[popped] = rng.uniform(4.0, 16.0, k)
+            x[popped] = cx + rng.uniform(-1.0, 1.0, k)*spread
+            y[popped] = cy + rng.uniform(-1.0, 1.0, k)*spread
+
+# ---------------- Benchmark ----------------
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="Time BubblePool.step at various pool sizes.")
+    ap.add_argument("--counts", default="260,10000,100000", help="comma-separated bubble counts")
+    ap.add_argument("--steps", type=int, default=200)
+    ap.add_argument("--hot", type=int, default=None,
+                    help="step only the newest HOT bubbles every tick (the drawn ones)")
+    args = ap.parse_args(argv)
+
+    for n in [int(c) for c in args.counts.split(",")]:
+        pool = BubblePool(n, rng=np.random.default_rng(0), hot=args.hot)
+        rng = pool.rng
+        pool.spawn_many(rng.uniform(-HALF*0.9, HALF*0.9, n), rng.uniform(-HALF*0.9, HALF*0.9, n),
+                        rng.uniform(4.0, POP_Z, n))
+        t0 = time.perf_counter()
+        for _ in range(args.steps):
+            pool.step(1.0/60.0)
+        el = (time.perf_counter() - t0) / args.steps
+        print(f"{n:>8} bubbles: {el*1000.0:8.3f} ms/step")
+
+if __name__ == "__main__":
+    main()
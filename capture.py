@@ -0,0 +1,177 @@
+"""Asynchronous frame capture through a ring of pixel buffer objects.
+
+grab() is called once per frame, after drawing and before the swap. It
+starts an asynchronous glReadPixels into the next PBO of the ring, then
+maps the oldest PBO, whose transfer has had ring-1 frames to complete, and
+copies it out into a recycled NumPy buffer. Writing happens on a worker
+thread, either appended to one raw RGBA file or as a PNG sequence, so the
+render thread never waits on the GPU or on the disk.
+
+    python FISH_TANK.py --capture run.rgba     # raw; see the .json next to it
+    python FISH_TANK.py --capture frames/      # PNG sequence
+    ffmpeg -f rawvideo -pix_fmt rgba -s 1000x800 -r FPS -i run.rgba -vf vflip run.mp4
+    ffmpeg -f concat -i frames/frames.ffconcat run.mp4
+
+Frames come at whatever rate the game draws, so each one is stamped when
+its readback starts. The raw sidecar (run.rgba.json) has those times and
+their mean rate as "fps", the FPS above; a PNG sequence gets an ffconcat
+list holding every frame's own duration.
+
+ring=0 is the naive path (a blocking glReadPixels every frame) kept for
+comparison in bench.py.
+"""
+import ctypes, json, os, queue, struct, threading, time, zlib
+from collections import deque
+import numpy as np
+from OpenGL import GL
+
+PNG_LEVEL = 1   # zlib level; the worker has one frame time per frame
+
+def write_png(path, rgba):
+    """Top-down RGBA rows (h, w, 4) to a PNG, with nothing but zlib."""
+    h, w, _ = rgba.shape
+    rows = np.empty((h, 1 + w*4), dtype=np.uint8)
+    rows[:, 0] = 0   # filter: none
+    rows[:, 1:] = rgba.reshape(h, w*4)
+    def chunk(tag, data):
+        return (struct.pack(">I", len(data)) + tag + data
+                + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff))
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 6, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(rows.tobytes(), PNG_LEVEL)))
+        f.write(chunk(b"IEND", b""))
+
+class FrameCapture:
+    def __init__(self, path, width, height, ring=3, max_pending=8):
+        self.path = path
+        self.png = path.endswith(os.sep) or os.path.isdir(path)
+        self.w, self.h = width, height
+        self.size = width * height * 4
+        self.ring = ring
+        self.clock = time.perf_counter
+        self.written = 0     # frames on disk
+        self.times = []      # clock() at each written frame's readback
+        self.dropped = 0     # frames skipped because the writer fell behind
+        self._read = 0       # readbacks started
+        self._stamps = deque()   # clock() of each readback still in a PBO
+        self._free = queue.Queue()
+        for _ in range(max_pending + 1):
+            self._free.put(np.empty((height, width, 4), dtype=np.uint8))
+        self._todo = queue.Queue()
+        self.pbos = [int(b) for b in np.atleast_1d(GL.glGenBuffers(ring))] if ring else []
+        for pbo in self.pbos:
+            GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, pbo)
+            GL.glBufferData(GL.GL_PIXEL_PACK_BUFFER, self.size, None, GL.GL_STREAM_READ)
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+        if self.png:
+            os.makedirs(path, exist_ok=True)
+            self._file = None
+        else:
+            self._file = open(path, "wb")
+        self._worker = threading.Thread(target=self._write_loop, name="capture", daemon=True)
+        self._worker.start()
+
+    def grab(self):
+        """Queue this frame's readback; hands the frame from ring-1 ago to the writer."""
+        GL.glPixelStorei(GL.GL_PACK_ALIGNMENT, 1)
+        if not self.ring:
+            buf = self._buffer()
+            if buf is not None:
+                stamp = self.clock()
+                GL.glReadPixels(0, 0, self.w, self.h, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE, buf)
+                self._todo.put((buf, stamp))
+            return
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, self.pbos[self._read % self.ring])
+        self._stamps.append(self.clock())
+        GL.glReadPixels(0, 0, self.w, self.h, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE, ctypes.c_void_p(0))
+        self._read += 1
+        if self._read >= self.ring:
+            self._collect(self.pbos[self._read % self.ring])
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+
+    def _buffer(self, block=False):
+        try:
+            return self._free.get(block)
+        except queue.Empty:
+            self.dropped += 1
+            return None
+
+    def _collect(self, pbo, block=False):
+        """Copy a PBO whose readback was issued ring-1 frames ago out to the writer."""
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, pbo)
+        stamp = self._stamps.popleft()
+        buf = self._buffer(block)
+        if buf is None:
+            return
+        ptr = GL.glMapBuffer(GL.GL_PIXEL_PACK_BUFFER, GL.GL_READ_ONLY)
+        if ptr:
+            ctypes.memmove(buf.ctypes.data, ptr, self.size)
+            GL.glUnmapBuffer(GL.GL_PIXEL_PACK_BUFFER)
+            self._todo.put((buf, stamp))
+        else:
+            self._free.put(buf)
+
+    def _write_loop(self):
+        while True:
+            item = self._todo.get()
+            if item is None:
+                return
+            buf, stamp = item
+            if self.png:
+                write_png(os.path.join(self.path, f"frame{self.written:06d}.png"), buf[::-1])
+            else:
+                self._file.write(buf.data)   # bottom-up rows, as GL reads them
+            self.times.append(stamp)
+            self.written += 1
+            self._free.put(buf)
+
+    def fps(self):
+        """Mean rate of the frames written, from their timestamps (None under two)."""
+        if len(self.times) < 2 or self.times[-1] <= self.times[0]:
+            return None
+        return (len(self.times) - 1) / (self.times[-1] - self.times[0])
+
+    def close(self):
+        """Collect the readbacks still in flight, finish writing, write the sidecar.
+
+        Safe to call twice, and late (from atexit) once the context is gone:
+        the frames still in flight are lost then, the rest is written.
+        """
+        if self._worker is None:
+            return
+        if self.pbos:
+            try:
+                start = max(0, self._read - self.ring + 1)
+                for k in range(start, self._read):
+                    self._collect(self.pbos[k % self.ring], block=True)
+                GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+                GL.glDeleteBuffers(len(self.pbos), self.pbos)
+            except GL.GLError:
+                pass
+            self.pbos = []
+        self._todo.put(None)
+        self._worker.join()
+        self._worker = None
+        if self._file is not None:
+            self._file.close()
+        t0 = self.times[0] if self.times else 0.0
+        if self.png:
+            self._write_concat()
+        elif os.path.isfile(self.path):   # not for /dev/null
+            with open(self.path + ".json", "w") as f:
+                json.dump({"width": self.w, "height": self.h, "pix_fmt": "rgba", "fps": self.fps(),
+                           "rows": "bottom-up", "frames": self.written, "dropped": self.dropped,
+                           "times": [round(t - t0, 6) for t in self.times]}, f)
+
+    def _write_concat(self):
+        """frames.ffconcat: the PNGs in order, each shown until the next was grabbed."""
+        if not self.times:
+            return
+        last = 1.0 / (self.fps() or 60.0)   # the final frame has no successor; use the mean
+        ends = self.times[1:] + [self.times[-1] + last]
+        with open(os.path.join(self.path, "frames.ffconcat"), "w") as f:
+            f.write("ffconcat version 1.0\n")
+            for k, (t, end) in enumerate(zip(self.times, ends)):
+                f.write(f"file frame{k:06d}.png\nduration {end - t:.6f}\n")
+            f.write(f"file frame{len(self.times)-1:06d}.png\n")   # concat ignores the last duration
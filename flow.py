@@ -0,0 +1,226 @@
+"""Flow field toward the hero, shared by every chasing enemy.
+
+The tank floor is cut into FLOW_CELL-sized cells. Cells under the bunker
+are blocked and the ring along the glass costs extra, so routes go around
+the bunker and keep off the walls. Each cell holds its path cost to the
+hero and a unit direction toward its cheapest neighbour; an enemy reads
+the direction of the cell it is in, O(1) however many chase.
+
+When the hero enters a neighbouring cell the old costs plus the price of
+that one step are an upper bound on every new cost, so the field is not
+rebuilt: relaxation sweeps just lower what changed, until it settles. A
+cold start (the first target, or the hero entering or leaving the bunker)
+settles the same way from scratch. Either way a tick runs at most
+SWEEPS_PER_TICK sweeps, and the directions are recomputed from the costs
+every REFRESH_TICKS ticks and once they settle, so no tick pays for a
+whole rebuild; the costs nearest the hero, which chasers read, settle
+first. The work is done on the first direction() lookup of a tick, so
+ticks with nobody chasing don't pay for it. Near the hero enemies steer
+straight at it.
+
+    python flow.py      # per-tick cost as the hero circles the tank
+"""
+import math, time
+import numpy as np
+
+from tank import AQUARIUM_BOUNDS, BUNKER_CENTER, BUNKER_RADIUS
+
+FLOW_CELL = 30.0
+WALL_COST = 2.0       # cost multiplier for entering a cell along the glass
+BUNKER_MARGIN = 20.0  # block cells this far outside the bunker wall as well
+NEAR_CELLS = 2.0      # within this many cells of path, steer straight at the hero
+SWEEPS_PER_TICK = 2   # relaxation sweeps per tick while the field settles
+REFRESH_TICKS = 4     # ...and directions recomputed this often meanwhile, and once settled
+
+# 8-neighbour steps (di, dj) and their lengths in cells
+STEPS = tuple((di, dj, math.hypot(di, dj)) for di in (-1, 0, 1) for dj in (-1, 0, 1)
+              if di or dj)
+STEP_X = np.array([di/length for di, dj, length in STEPS])   # unit direction of each step
+STEP_Y = np.array([dj/length for di, dj, length in STEPS])
+
+class FlowField:
+    def __init__(self, cell=FLOW_CELL, bound=AQUARIUM_BOUNDS):
+        self.cell = cell
+        self.inv_cell = 1.0 / cell
+        self.origin = -bound
+        n = self.n = int(math.ceil(2*bound / cell))
+        centres = self.origin + (np.arange(n) + 0.5) * cell
+        self.cx, self.cy = np.meshgrid(centres, centres, indexing="ij")   # [i, j] = (x, y)
+
+        bx, by = BUNKER_CENTER
+        block_r = BUNKER_RADIUS + BUNKER_MARGIN
+        self.blocked = (self.cx - bx)**2 + (self.cy - by)**2 <= block_r*block_r
+        w = np.ones((n, n))
+        w[0, :] = w[-1, :] = w[:, 0] = w[:, -1] = WALL_COST
+        w[self.blocked] = np.inf
+        self.weight = w
+        # One relaxation pass per step: cells [dst] reached from cells [src].
+        self._passes = []
+        for di, dj, length in STEPS:
+            dst = (slice(max(di, 0), n + min(di, 0)), slice(max(dj, 0), n + min(dj, 0)))
+            src = (slice(max(-di, 0), n + min(-di, 0)), slice(max(-dj, 0), n + min(-dj, 0)))
+            self._passes.append((dst, src, w[dst]*length))
+        # Free cells next to the bunker, where routes start when the hero is inside it.
+        rim = np.zeros_like(self.blocked)
+        for dst, src, _ in self._passes:
+            rim[dst] |= self.blocked[src]
+        self.rim = rim & ~self.blocked
+        self.rim_x, self.rim_y = self.cx[self.rim], self.cy[self.rim]
+        # Blocked cells point straight out of the bunker.
+        away_x, away_y = self.cx - bx, self.cy - by
+        norm = np.hypot(away_x, away_y) + 1e-9
+        self.escape_x, self.escape_y = away_x / norm, away_y / norm
+
+        self.cost = np.full((n, n), np.inf)
+        self._pad = np.full((n+2, n+2), np.inf)   # cost with a border nobody steps to
+        self._around = np.empty((len(STEPS), n, n))   # each cell's neighbours' costs
+        self.rebuilds = 0
+        self.sweeps = 0      # relaxation sweeps run so far
+        self.reset()
+
+    def reset(self):
+        """Forget the hero; the next update() starts from scratch."""
+        n = self.n
+        self.cost.fill(np.inf)
+        self.dir_x = np.zeros((n, n))
+        self.dir_y = np.zeros((n, n))
+        self.target = None   # hero cell the field points at
+        self.settled = True  # costs exact for target; nothing left to relax
+        self.stale_ticks = 0 # ticks the directions have lagged the costs
+        self.aim = None      # hero position from update(), until a lookup uses it
+
+    def cell_of(self, x, y):
+        n = self.n
+        i = int((x - self.origin) * self.inv_cell)
+        j = int((y - self.origin) * self.inv_cell)
+        return min(max(i, 0), n-1), min(max(j, 0), n-1)
+
+    def update(self, x, y):
+        """Point the field at (x, y) for this tick; the work waits for a lookup."""
+        self.aim = (x, y)
+
+    def _catch_up(self):
+        """Retarget and spend one tick's relaxation budget; whether directions changed."""
+        x, y = self.aim
+        self.aim = None
+        target = self.cell_of(x, y)
+        if target != self.target:
+            old, self.target = self.target, target
+            if (old is not None and not self.blocked[old] and not self.blocked[target]
+                    and max(abs(old[0]-target[0]), abs(old[1]-target[1])) == 1):
+                # new cost <= old cost + the price of stepping back to the old cell
+                self.cost += math.hypot(old[0]-target[0], old[1]-target[1]) * self.weight[old]
+            else:
+                # Into or out of the bunker, or a jump: start over. Cells the
+                # sweeps haven't reached yet steer straight meanwhile.
+                self.cost.fill(np.inf)
+            self._seed(self.cost, target, x, y)
+            self.rebuilds += 1
+            retargeted = True
+        elif self.settled:
+            return False
+        else:
+            retargeted = False
+        lowered, self.settled = self._relax(self.cost, SWEEPS_PER_TICK)
+        if retargeted or lowered:
+            self.stale_ticks += 1
+        if self.stale_ticks and (self.settled or self.stale_ticks >= REFRESH_TICKS):
+            self.refresh()
+            return True
+        return False
+
+    def _seed(self, cost, target, x, y):
+        if not self.blocked[target]:
+            cost[target] = 0.0
+            return
+        # Hero inside the bunker: start from the free cells around it instead.
+        rim = self.rim
+        d = np.hypot(self.rim_x - x, self.rim_y - y) * self.inv_cell
+        np.minimum(cost[rim], d, out=d)
+        cost[rim] = d
+
+    def _relax(self, cost, budget):
+        """Bellman-Ford sweeps over `cost` in place.
+
+        Returns (lowered anything, settled: a sweep lowered nothing).
+        """
+        before = np.empty_like(cost)
+        for k in range(budget):
+            before[...] = cost
+            for dst, src, step_cost in self._passes:
+                view = cost[dst]
+                np.minimum(view, cost[src] + step_cost, out=view)
+            self.sweeps += 1
+            if np.array_equal(before, cost):
+                return k > 0, True
+        return True, False
+
+    def refresh(self):
+        """Recompute the directions from the costs."""
+        n, cost = self.n, self.cost
+        pad, around = self._pad, self._around
+        pad[1:-1, 1:-1] = cost
+        for k, (di, dj, _) in enumerate(STEPS):
+            around[k] = pad[1+di:1+di+n, 1+dj:1+dj+n]
+        best = around.argmin(axis=0)   # first cheapest neighbour, in STEPS order
+        downhill = np.take_along_axis(around, best[None], axis=0)[0] < cost
+        dx = np.where(downhill, STEP_X[best], 0.0)
+        dy = np.where(downhill, STEP_Y[best], 0.0)
+        dx[self.blocked] = self.escape_x[self.blocked]
+        dy[self.blocked] = self.escape_y[self.blocked]
+        # Near the hero (and wherever no route exists yet) steer straight instead.
+        straight = (cost <= NEAR_CELLS) | ~np.isfinite(cost)
+        straight &= ~self.blocked
+        dx[straight] = 0.0; dy[straight] = 0.0
+        self.dir_x, self.dir_y = dx, dy
+        self.stale_ticks = 0
+
+    def direction(self, x, y):
+        """Unit (dx, dy) to follow from (x, y), or None to steer straight."""
+        if self.aim is not None:
+            self._catch_up()
+        i, j = self.cell_of(x, y)
+        fx = self.dir_x[i, j]; fy = self.dir_y[i, j]
+        if fx == 0.0 and fy == 0.0:
+            return None
+        return float(fx), float(fy)
+
+    def directions(self, x, y):
+        """Vectorised direction(): (dx, dy) arrays, both 0 where to steer straight."""
+        if self.aim is not None:
+            self._catch_up()
+        n = self.n
+        i = np.clip(((x - self.origin) * self.inv_cell).astype(int), 0, n-1)
+        j = np.clip(((y - self.origin) * self.inv_cell).astype(int), 0, n-1)
+        return self.dir_x[i, j], self.dir_y[i, j]
+
+# ---------------- Benchmark ----------------
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="Time the flow field while the hero circles the tank at full speed.")
+    ap.add_argument("--cell", type=float, default=FLOW_CELL)
+    ap.add_argument("--steps", type=int, default=660, help="ticks of the hero circling the tank")
+    args = ap.parse_args(argv)
+
+    f = FlowField(args.cell)
+    def tick(x, y):   # what a world tick costs the field: aim, then one chaser's lookup
+        t0 = time.perf_counter()
+        f.update(x, y); f.direction(0.0, 0.0)
+        return time.perf_counter() - t0
+    cold = []
+    f.settled = False
+    while not f.settled:
+        cold.append(tick(-400.0, -400.0))
+    sweeps, laps = f.sweeps, []
+    for k in range(args.steps):
+        # 240 units/s, the hero's top speed, around a circle at 60 ticks/s
+        a = k * 4.0/420.0
+        laps.append(tick(420.0*math.cos(a), 420.0*math.sin(a)))
+    ms = np.asarray(laps) * 1000.0
+    print(f"{f.n}x{f.n} cells of {args.cell:g}, {SWEEPS_PER_TICK} sweeps a tick at most")
+    print(f"cold build: {len(cold)} ticks, {sum(cold)*1000:.2f} ms in all, worst tick {max(cold)*1000:.2f} ms")
+    print(f"circling: {f.rebuilds - 1} cell changes in {len(laps)} ticks, {f.sweeps - sweeps} sweeps; "
+          f"per tick mean {ms.mean():.3f} ms, p99 {np.percentile(ms, 99):.3f} ms, worst {ms.max():.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""View-frustum culling and level-of-detail selection.
+
+Rebuilds the same projection and view matrices gluPerspective/gluLookAt
+produce in setupCamera(), extracts the six clip planes, and tests bounding
+spheres against them. A visible sphere also gets its projected radius in
+pixels, which picks a tessellation level. No OpenGL in here.
+"""
+import math
+import numpy as np
+
+# Projected radius (pixels) at or above which each LOD level is used;
+# anything smaller gets the last level.
+LOD_PIXELS = (28.0, 9.0)
+
+def perspective(fovy, aspect, near, far):
+    f = 1.0 / math.tan(math.radians(fovy) * 0.5)
+    return np.array([[f/aspect, 0, 0, 0],
+                     [0, f, 0, 0],
+                     [0, 0, (far+near)/(near-far), 2*far*near/(near-far)],
+                     [0, 0, -1, 0]])
+
+def look_at(eye, at, up):
+    eye = np.asarray(eye, dtype=float)
+    f = np.asarray(at, dtype=float) - eye
+    f /= np.linalg.norm(f)
+    s = np.cross(f, up)
+    n = np.linalg.norm(s)
+    if n < 1e-9:   # looking straight along `up`; any side vector will do
+        s = np.cross(f, (0.0, 1.0, 0.0)); n = np.linalg.norm(s)
+    s /= n
+    u = np.cross(s, f)
+    m = np.identity(4)
+    m[0, :3], m[1, :3], m[2, :3] = s, u, -f
+    m[:3, 3] = -m[:3, :3] @ eye
+    return m
+
+class Frustum:
+    def __init__(self, fovy, aspect, near, far, eye, at, up, view_h):
+        clip = perspective(fovy, aspect, near, far) @ look_at(eye, at, up)
+        planes = np.array([clip[3] + clip[0], clip[3] - clip[0],   # left, right
+                           clip[3] + clip[1], clip[3] - clip[1],   # bottom, top
+                           clip[3] + clip[2], clip[3] - clip[2]])  # near, far
+        planes /= np.linalg.norm(planes[:, :3], axis=1)[:, None]
+        self.planes = planes
+        self._planes = [tuple(p) for p in planes.tolist()]
+        self.eye = tuple(float(c) for c in eye)
+        # pixels per world unit at distance 1
+        self.px_scale = (view_h * 0.5) / math.tan(math.radians(fovy) * 0.5)
+
+    def sphere_px(self, x, y, z, r):
+        """Projected radius in pixels, or 0.0 if the sphere is outside."""
+        for a, b, c, d in self._planes:
+            if a*x + b*y + c*z + d < -r:
+                return 0.0
+        ex, ey, ez = self.eye
+        dist = math.sqrt((x-ex)**2 + (y-ey)**2 + (z-ez)**2)
+        if dist <= r:
+            return float("inf")
+        return r * self.px_scale / dist
+
+    def spheres_px(self, x, y, z, r):
+        """sphere_px() for arrays of spheres."""
+        ex, ey, ez = self.eye
+        dist = np.sqrt((x-ex)**2 + (y-ey)**2 + (z-ez)**2)
+        with np.errstate(divide="ignore"):
+            px = np.where(dist <= r, np.inf, r * self.px_scale / dist)
+        px[~self.spheres_visible(x, y, z, r)] = 0.0
+        return px
+
+    def spheres_visible(self, x, y, z, r):
+        """Boolean mask of the spheres (arrays) that intersect the frustum."""
+        vis = np.ones(len(x), dtype=bool)
+        for a, b, c, d in self._planes:
+            vis &= a*x + b*y + c*z + d >= -r
+        return vis
+
+def lod_levels(px):
+    """lod_level() for an array of pixel radii."""
+    return (np.asarray(px)[:, None] < np.array(LOD_PIXELS)).sum(axis=1)
+
+def lod_level(px):
+    for level, limit in enumerate(LOD_PIXELS):
+        if px >= limit:
+            return level
+    return len(LOD_PIXELS)
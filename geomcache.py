@@ -0,0 +1,51 @@
+"""On-disk cache for generated static geometry.
+
+cached_arrays(name, params, build) returns build()'s tuple of NumPy arrays,
+stored as an .npz under CACHE_DIR keyed by a hash of `name` and `params`,
+so a mesh is only generated again when something it depends on changes.
+Set FISH_TANK_CACHE to another directory, or to "off" to skip the cache.
+"""
+import hashlib, json, os, zipfile
+import numpy as np
+
+CACHE_VERSION = 1   # bump to drop every cached file
+CACHE_DIR = os.environ.get("FISH_TANK_CACHE") or os.path.join(
+    os.path.expanduser("~"), ".cache", "fish_tank")
+
+def cache_path(name, params):
+    key = json.dumps([CACHE_VERSION, name, params], sort_keys=True)
+    return os.path.join(CACHE_DIR, f"{name}-{hashlib.sha1(key.encode()).hexdigest()[:16]}.npz")
+
+def cached_arrays(name, params, build):
+    """build() (a tuple of arrays), read from / written to the cache.
+
+    `params` must be JSON-serialisable and cover everything the geometry
+    depends on. A missing, corrupt or unwritable cache just means build();
+    a corrupt file is deleted and written again.
+    """
+    if CACHE_DIR == "off":
+        return build()
+    path = cache_path(name, params)
+    try:
+        with np.load(path) as z:
+            return tuple(z[f"a{i}"] for i in range(len(z.files)))
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+        discard(path)   # truncated or corrupt: rebuild it below
+    arrays = build()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(tmp, "wb") as f:
+            np.savez(f, **{f"a{i}": a for i, a in enumerate(arrays)})
+        os.replace(tmp, path)   # never leave a half-written file under the real name
+    except OSError:
+        discard(tmp)
+    return arrays
+
+def discard(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
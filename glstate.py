@@ -0,0 +1,94 @@
+"""Redundant GL state-change filter.
+
+All fixed-function state the renderer touches per frame (capabilities,
+blend function, depth mask, colour material, light parameters and the
+projection) goes through one StateCache. It remembers what it last set and
+only calls into GL when a value actually changes, so drawing helpers can
+just ask for the state they need instead of restoring it afterwards.
+
+Client-side arrays are not cached: freeglut's solids enable and disable
+them behind our back. Anything else that changes cached state directly
+(display lists, glPushAttrib) must call invalidate() afterwards.
+"""
+from OpenGL import GL
+
+class StateCache:
+    def __init__(self):
+        self.issued = 0      # GL calls made this frame
+        self.filtered = 0    # calls skipped this frame because nothing changed
+        self.last = (0, 0)   # (issued, filtered) of the previous frame
+        self.invalidate()
+
+    def invalidate(self):
+        """Forget everything; the next request for each piece of state goes to GL."""
+        self._caps = {}
+        self._blend = None
+        self._depth_mask = None
+        self._color_material = None
+        self._lights = {}
+        self._projection = None
+
+    def new_frame(self):
+        self.last = (self.issued, self.filtered)
+        self.issued = self.filtered = 0
+
+    def _changed(self, current, wanted):
+        if current == wanted:
+            self.filtered += 1
+            return False
+        self.issued += 1
+        return True
+
+    def enable(self, cap):
+        if self._changed(self._caps.get(cap), True):
+            GL.glEnable(cap)
+            self._caps[cap] = True
+
+    def disable(self, cap):
+        if self._changed(self._caps.get(cap), False):
+            GL.glDisable(cap)
+            self._caps[cap] = False
+
+    def blend_func(self, src, dst):
+        if self._changed(self._blend, (src, dst)):
+            GL.glBlendFunc(src, dst)
+            self._blend = (src, dst)
+
+    def depth_mask(self, flag):
+        flag = bool(flag)
+        if self._changed(self._depth_mask, flag):
+            GL.glDepthMask(GL.GL_TRUE if flag else GL.GL_FALSE)
+            self._depth_mask = flag
+
+    def color_material(self, face, mode):
+        if self._changed(self._color_material, (face, mode)):
+            GL.glColorMaterial(face, mode)
+            self._color_material = (face, mode)
+
+    def light(self, light, pname, value, view=None):
+        """glLightfv, skipped when unchanged.
+
+        GL_POSITION and GL_SPOT_DIRECTION are transformed by the modelview
+        matrix current at the call, so pass the camera they were set under
+        as `view`; a new view re-sends them.
+        """
+        key = (light, pname)
+        value = tuple(value)
+        if self._changed(self._lights.get(key), (value, view)):
+            GL.glLightfv(light, pname, value)
+            self._lights[key] = (value, view)
+
+    def projection(self, fovy, aspect, near, far):
+        """Load a perspective projection unless it's already loaded.
+
+        Expects GL_MODELVIEW to be the current matrix and leaves it so.
+        Anything that replaces the projection without restoring it must
+        invalidate().
+        """
+        params = (fovy, aspect, near, far)
+        if self._changed(self._projection, params):
+            from OpenGL.GLU import gluPerspective
+            GL.glMatrixMode(GL.GL_PROJECTION); GL.glLoadIdentity()
+            gluPerspective(fovy, aspect, near, far)
+            GL.glMatrixMode(GL.GL_MODELVIEW)
+            self._projection = params
@@ -0,0 +1,88 @@
+"""Per-phase frame profiler.
+
+The world and the renderer call lap(phase) at the end of each phase of a
+tick or frame; end_frame() closes the frame, folds it into a running
+average for the on-screen overlay and optionally streams it to a CSV or
+JSONL file. Instrumented code holds `profiler = None` when profiling is off,
+so the disabled cost is one falsy check per phase.
+"""
+import csv, json, time
+
+SIM_PHASES = ("input", "hero", "flow", "enemy_ai", "separation", "food", "collision", "bubbles")
+DRAW_PHASES = ("setup", "sand", "scenery", "plants", "food_draw", "fish", "bubbles_draw",
+               "walls", "hud")
+PHASES = SIM_PHASES + DRAW_PHASES
+
+class Profiler:
+    def __init__(self, out_path=None, smoothing=0.1):
+        self.clock = time.perf_counter
+        self.t = self.clock()
+        self.frame = dict.fromkeys(PHASES, 0.0)
+        self.avg = dict.fromkeys(PHASES, 0.0)   # seconds, exponential moving average
+        self.frame_start = self.t
+        self.frame_total = 0.0
+        self.avg_total = 0.0
+        self.frames = 0
+        self.smoothing = smoothing
+        self._file = self._writer = None
+        if out_path:
+            self.open(out_path)
+
+    def open(self, path):
+        self._file = open(path, "w", newline="")
+        if path.endswith(".csv"):
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(("frame", "total_ms") + tuple(p + "_ms" for p in PHASES))
+        else:
+            self._writer = None  # JSON lines
+
+    @property
+    def streaming(self):
+        return self._file is not None
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def start(self):
+        """Start timing from now; the next lap() measures from here."""
+        self.t = self.clock()
+
+    def lap(self, phase):
+        now = self.clock()
+        self.frame[phase] += now - self.t
+        self.t = now
+
+    def end_frame(self):
+        now = self.clock()
+        total = now - self.frame_start
+        self.frame_start = now
+        self.frames += 1
+        a = self.smoothing if self.frames > 1 else 1.0
+        frame, avg = self.frame, self.avg
+        for p in PHASES:
+            avg[p] += (frame[p] - avg[p]) * a
+        self.frame_total = total
+        self.avg_total += (total - self.avg_total) * a
+        if self._file is not None:
+            ms = [round(frame[p]*1000.0, 4) for p in PHASES]
+            if self._writer is not None:
+                self._writer.writerow([self.frames, round(total*1000.0, 4)] + ms)
+            else:
+                row = {"frame": self.frames, "total_ms": round(total*1000.0, 4)}
+                row.update(zip(PHASES, ms))
+                self._file.write(json.dumps(row) + "\n")
+        for p in PHASES:
+            frame[p] = 0.0
+
+    def overlay_lines(self):
+        """Text lines for the HUD overlay, averaged over recent frames."""
+        avg = self.avg
+        def fmt(phases):
+            return "  ".join(f"{p} {avg[p]*1000.0:.2f}" for p in phases)
+        return [f"PROFILE ms  frame {self.avg_total*1000.0:.2f}",
+                "sim: " + fmt(SIM_PHASES[:4]),
+                "     " + fmt(SIM_PHASES[4:]),
+                "draw: " + fmt(DRAW_PHASES[:5]),
+                "      " + fmt(DRAW_PHASES[5:])]
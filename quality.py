@@ -0,0 +1,128 @@
+"""Adaptive quality: trade detail for frame rate on slow machines.
+
+QualityController is fed every frame's wall interval and its busy time
+(sim plus drawing, without the buffer swap). It steps down one level when
+frames stay over budget, and back up only when they stay well under it.
+A level that had to be given up again right away is not retried for a
+while, and the wait doubles each time this happens. That keeps it from
+flapping between two levels.
+
+Each Level scales what costs the most under Mesa software rendering:
+
+    bubbles    share of the world's bubble draw (= hot) and spawn caps
+    sphere     bubble sphere tessellation (slices, stacks)
+    lod_bias   added to every fish/food LOD level
+    plant      plant stalk detail (see render.PLANT_TESS)
+    max_ticks  sim ticks a frame may catch up before the game slows down
+
+    python FISH_TANK.py --target-fps 30      # hold 30 FPS
+    python FISH_TANK.py --quality 2          # fixed level, no adapting
+"""
+from collections import deque, namedtuple
+
+Level = namedtuple("Level", "bubbles sphere lod_bias plant max_ticks")
+
+LEVELS = (
+    Level(1.00, (12, 10), 0, 0, 3),
+    Level(0.75, (10, 8), 0, 1, 3),
+    Level(0.50, (8, 6), 1, 1, 2),
+    Level(0.30, (6, 5), 1, 2, 2),
+    Level(0.15, (5, 4), 2, 2, 1),
+)
+
+WINDOW = 30          # frames averaged per decision
+DOWN_AT = 1.10       # step down above this share of the frame budget...
+UP_AT = 0.60         # ...and up only below this share of it, busy time
+COOLDOWN = 45        # frames after a change before judging the new level
+RETRY = 300          # frames before retrying a level that failed straight away
+
+class QualityController:
+    def __init__(self, target_fps=60.0, level=0, adaptive=True):
+        if not 0 <= level < len(LEVELS):
+            raise ValueError(f"quality level must be 0..{len(LEVELS)-1}, not {level!r}")
+        self.budget = 1.0 / target_fps
+        self.level = level
+        self.adaptive = adaptive
+        self.intervals = deque(maxlen=WINDOW)
+        self.busy = deque(maxlen=WINDOW)
+        self.cooldown = COOLDOWN
+        self.blocked = {}    # level: frames until it may be tried again
+        self.retry = RETRY
+        self.raised = None   # level we last stepped up to, while on probation
+
+    @property
+    def current(self):
+        return LEVELS[self.level]
+
+    def label(self):
+        return f"{self.level}/{len(LEVELS)-1}" + (" auto" if self.adaptive else "")
+
+    def frame(self, interval, busy):
+        """Record one frame; returns True when the level changed."""
+        if not self.adaptive:
+            return False
+        self.intervals.append(interval)
+        self.busy.append(busy)
+        for lv in list(self.blocked):
+            self.blocked[lv] -= 1
+            if self.blocked[lv] <= 0:
+                del self.blocked[lv]
+        if self.cooldown > 0:
+            self.cooldown -= 1
+            return False
+        if len(self.intervals) < WINDOW:
+            return False
+        interval = sum(self.intervals) / WINDOW
+        busy = sum(self.busy) / WINDOW
+        if interval > self.budget*DOWN_AT and self.level < len(LEVELS) - 1:
+            if self.raised == self.level:
+                # just stepped up to this level and it didn't hold
+                self.blocked[self.level] = self.retry
+                self.retry *= 2
+            self._set(self.level + 1)
+            self.raised = None
+            return True
+        if (self.level > 0 and interval <= self.budget*DOWN_AT and busy < self.budget*UP_AT
+                and self.level - 1 not in self.blocked):
+            self._set(self.level - 1)
+            self.raised = self.level
+            return True
+        if self.raised == self.level:
+            self.raised = None   # held for a whole window after its cooldown
+        return False
+
+    def _set(self, level):
+        self.level = level
+        self.cooldown = COOLDOWN
+        self.intervals.clear()
+        self.busy.clear()
+
+# ---------------- Check ----------------
+def main(argv=None):
+    import argparse, random
+    ap = argparse.ArgumentParser(description="Run the controller against a fake frame-cost model.")
+    ap.add_argument("--target-fps", type=float, default=60.0)
+    ap.add_argument("--cost-ms", default="30,24,17,12,8",
+                    help="busy ms per frame at each level, best first")
+    ap.add_argument("--frames", type=int, default=3000)
+    ap.add_argument("--jitter", type=float, default=0.15, help="relative frame-time noise")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args(argv)
+
+    cost = [float(c) / 1000.0 for c in args.cost_ms.split(",")]
+    if len(cost) != len(LEVELS):
+        ap.error(f"--cost-ms wants {len(LEVELS)} values")
+    rng = random.Random(args.seed)
+    q = QualityController(args.target_fps)
+    changes, held = 0, [0]*len(LEVELS)
+    for k in range(args.frames):
+        busy = cost[q.level] * (1.0 + rng.uniform(-args.jitter, args.jitter))
+        interval = max(busy, q.budget)   # vsync: never faster than the target
+        if q.frame(interval, busy):
+            changes += 1
+            print(f"frame {k:5d}: level {q.label()}")
+        held[q.level] += 1
+    print(f"{changes} changes; frames per level: {held}")
+
+if __name__ == "__main__":
+    main()
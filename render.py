@@ -0,0 +1,866 @@
+"""The renderer: everything FISH_TANK.py draws, and its GLUT callbacks.
+
+PyOpenGL is a large share of startup, so FISH_TANK.main() and
+bench.init_gl() import this module only once there is something to draw.
+Importing FISH_TANK (tools, bench.py) or asking it for --help never loads GL.
+"""
+from OpenGL.GL import *
+from OpenGL.GLUT import *
+from OpenGL.GLU import *
+from OpenGL.GLUT import GLUT_BITMAP_HELVETICA_18
+
+import math, sys, time, atexit
+import numpy as np
+
+from terrain import SAND
+from geomcache import cached_arrays
+from profiler import Profiler
+from frustum import Frustum, lod_level, lod_levels
+import tank
+from world import DIFFS, MOVE_KEYS, ENEMY_SIZE, ENEMY_COLORS, hero_in_bunker, clamp
+#JUNAED
+# ---------------- Window / Camera ----------------
+WIN_W, WIN_H = 1000, 800
+ASPECT = WIN_W / WIN_H
+fovY = 70
+
+# Camera 
+camera_pos = [0.0, 500.0, 520.0]
+first_person = False  
+camera_pitch = 0.0    
+
+# Gameplay state lives in world.World; the renderer only reads it.
+world = None
+sim = None     # simthread.SimThread when the world steps on its own thread
+scene = None   # what this frame draws: the world itself, or a blended snapshot of it
+
+# ---------------- Scenery ----------------
+# Each plant's stalks (stem + tip) are compiled once into display lists; per
+# frame only the sway rotation is applied. Freed when the world resets.
+plant_meshes = {}
+
+# Per plant detail level (quality.Level.plant): stalk slices, tip (slices, stacks).
+PLANT_TESS = [(7, (8, 8)), (5, (6, 5)), (4, (4, 3))]
+plant_detail = 0
+
+def plant_mesh(p):
+    base = plant_meshes.get(p)
+    if base is None:
+        quad = shared_quadric()
+        slices, tip = PLANT_TESS[plant_detail]
+        base = glGenLists(p.stalks)
+        for i, h in enumerate(p.stalk_heights):
+            glNewList(base + i, GL_COMPILE)
+            glColor3f(0.10, 0.52, 0.14)
+            gluCylinder(quad, 2.0, 0.8, h, slices, 1)
+            glTranslatef(0,0,h)
+            glColor3f(0.15, 0.7, 0.18)
+            solid_sphere(3.5, *tip)
+            glEndList()
+        plant_meshes[p] = base
+    return base
+
+plant_owner = None   # (world, generation) the cached plants belong to
+
+def release_plant_meshes():
+    global plant_owner
+    for p, base in plant_meshes.items():
+        glDeleteLists(base, p.stalks)
+    plant_meshes.clear()
+    plant_owner = (world, scene.generation)
+
+def draw_plant(p, t):
+    base = plant_mesh(p)
+    glPushMatrix()
+    glTranslatef(p.x, p.y, 0.0)
+    for i in range(p.stalks):
+        ang = (i/p.stalks)*math.tau + p.phase
+        sway = math.sin(t*1.1 + ang)*8.0
+        glPushMatrix()
+        glRotatef(sway, 0,1,0)
+        glCallList(base + i)
+        glPopMatrix()
+    glPopMatrix()
+
+# Bubbler / Pump
+def draw_bubbler(pos):
+    x,y,z = pos
+    glPushMatrix()
+    glTranslatef(x,y,z)
+    
+    glColor3f(0.3,0.3,0.33)
+    glPushMatrix()
+    glScalef(20, 20, 6)
+    solid_cube(1.0)
+    glPopMatrix()
+   
+    glTranslatef(0, 0, 6.0)
+    glRotatef(-90, 1,0,0)
+    glColor3f(0.5,0.52,0.55)
+    gluCylinder(shared_quadric(), 2.0, 2.0, 20.0, 10, 1)
+    glPopMatrix()
+
+# ---------------- Drawing helpers ----------------
+# Render state goes through gl_state (glstate.StateCache), which drops calls
+# that wouldn't change anything. Helpers ask for the state they need and
+# don't restore it: solid geometry runs under opaque_state(), which
+# draw_scene() sets up front, and the blended parts come after it.
+gl_state = None
+
+def opaque_state():
+    gl_state.enable(GL_DEPTH_TEST)
+    gl_state.enable(GL_CULL_FACE)
+    gl_state.disable(GL_BLEND)
+    gl_state.depth_mask(True)
+
+def blend_state(depth_write=True):
+    """Alpha blending, both faces drawn."""
+    gl_state.enable(GL_DEPTH_TEST)
+    gl_state.enable(GL_BLEND)
+    gl_state.blend_func(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+    gl_state.disable(GL_CULL_FACE)
+    gl_state.depth_mask(depth_write)
+
+# HUD text: every string drawn at a given spot (position + font) is compiled
+# into its own display list, recompiled only when the string there changes.
+# draw_text must be called between begin_hud() and end_hud(), which set up
+# the 2D projection once for the whole HUD pass.
+text_slots = {}
+
+def begin_hud():
+    glMatrixMode(GL_PROJECTION); glPushMatrix(); glLoadIdentity()
+    gluOrtho2D(0, WIN_W, 0, WIN_H)
+    glMatrixMode(GL_MODELVIEW); glPushMatrix(); glLoadIdentity()
+
+def end_hud():
+    glPopMatrix()
+    glMatrixMode(GL_PROJECTION); glPopMatrix()
+    glMatrixMode(GL_MODELVIEW)
+
+def draw_text(x, y, text, font=GLUT_BITMAP_HELVETICA_18):
+    key = (x, y, id(font))   # GLUT font handles aren't hashable
+    slot = text_slots.get(key)
+    if slot is None or slot[0] != text:
+        lst = slot[1] if slot is not None else glGenLists(1)
+        glNewList(lst, GL_COMPILE)
+        for ch in text:
+            glutBitmapCharacter(font, ord(ch))
+        glEndList()
+        slot = text_slots[key] = (text, lst)
+    glRasterPos2f(x, y)
+    glCallList(slot[1])
+
+#MAHIM
+# Fish meshes are compiled once per (size, colour, LOD) into display lists;
+# only the tail wag and side-fin flap rotations are applied per frame.
+_quadric = None
+def shared_quadric():
+    global _quadric
+    if _quadric is None:
+        _quadric = gluNewQuadric()
+    return _quadric
+
+# Solids drawn through GLU rather than glutSolid*, which abort unless
+# glutInit() ran; bench.py renders through OSMesa without GLUT.
+def solid_sphere(radius, slices, stacks):
+    gluSphere(shared_quadric(), radius, slices, stacks)
+
+CUBE_FACES = (((0, 0, 1), ((-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1))),
+              ((0, 0, -1), ((-1, -1, -1), (-1, 1, -1), (1, 1, -1), (1, -1, -1))),
+              ((1, 0, 0), ((1, -1, -1), (1, 1, -1), (1, 1, 1), (1, -1, 1))),
+              ((-1, 0, 0), ((-1, -1, -1), (-1, -1, 1), (-1, 1, 1), (-1, 1, -1))),
+              ((0, 1, 0), ((-1, 1, -1), (-1, 1, 1), (1, 1, 1), (1, 1, -1))),
+              ((0, -1, 0), ((-1, -1, -1), (1, -1, -1), (1, -1, 1), (-1, -1, 1))))
+
+def solid_cube(size):
+    h = size*0.5
+    glBegin(GL_QUADS)
+    for normal, corners in CUBE_FACES:
+        glNormal3f(*normal)
+        for cx, cy, cz in corners:
+            glVertex3f(cx*h, cy*h, cz*h)
+    glEnd()
+
+fish_meshes = {}
+FISH_BODY, FISH_TAIL, FISH_FIN = 0, 1, 2   # offsets into a fish's list block
+FISH_RADIUS = 1.6   # bounding sphere radius as a multiple of fish size (tail tip)
+
+# Per LOD level (see frustum.lod_level): body (slices, stacks), tail, dorsal
+# and side-fin slices, eye and pupil (slices, stacks); None drops the eyes.
+FISH_TESS = [
+    ((24, 18), 18, 14, 10, (10, 10), (8, 8)),
+    ((14, 10), 10, 8, 6, (6, 6), (5, 5)),
+    ((8, 6), 6, 5, 4, None, None),
+]
+
+def fish_mesh(size, base_col, lod=0):
+    key = (size, tuple(base_col), lod)
+    base = fish_meshes.get(key)
+    if base is None:
+        base = build_fish_mesh(size, base_col, FISH_TESS[lod])
+        fish_meshes[key] = base
+    return base
+
+def build_fish_mesh(size, base_col, tess=FISH_TESS[0]):
+    """Ellipsoid body with dorsal fin and eyes, plus separate tail and fin cones."""
+    body_tess, tail_sl, dorsal_sl, fin_sl, eye_tess, pupil_tess = tess
+    quad = shared_quadric()
+    base = glGenLists(3)
+
+    glNewList(base + FISH_BODY, GL_COMPILE)
+    glPushMatrix()
+    glScalef(1.6, 2.2, 1.0)  
+    glColor3f(*base_col)     
+    solid_sphere(size*0.25, *body_tess)
+    glPopMatrix()
+
+    glPushMatrix()
+    glTranslatef(0, 0, size*0.35)
+    glRotatef(-90, 1, 0, 0)
+    glColor3f(base_col[0]*1.1, base_col[1]*1.1, base_col[2]*1.1)
+    gluCylinder(quad, size*0.08, 0.0, size*0.30, dorsal_sl, 1)
+    glPopMatrix()
+
+    for sgn in (-1, 1) if eye_tess else ():
+        glPushMatrix()
+        glTranslatef(size*0.28*sgn, size*0.25, size*0.10)
+        glColor3f(0.95, 0.95, 0.95)
+        solid_sphere(size*0.06, *eye_tess)
+        glTranslatef(0, size*0.02, size*0.03)
+        glColor3f(0.05, 0.05, 0.05)
+        solid_sphere(size*0.03, *pupil_tess)
+        glPopMatrix()
+    glEndList()
+
+    glNewList(base + FISH_TAIL, GL_COMPILE)
+    glColor3f(base_col[0]*0.9, base_col[1]*0.9, base_col[2]*0.9)
+    gluCylinder(quad, size*0.16, 0.0, size*0.8, tail_sl, 1)
+    glEndList()
+
+    glNewList(base + FISH_FIN, GL_COMPILE)
+    glColor3f(base_col[0]*1.05, base_col[1]*1.05, base_col[2]*1.05)
+    gluCylinder(quad, size*0.04, 0.0, size*0.30, fin_sl, 1)
+    glEndList()
+    return base
+
+def draw_realistic_fish(size, base_col, t, enemy=False, lod=0):
+    """More 'real' fish: ellipsoid body, animated tail, side fins, eyes"""
+    base = fish_mesh(size, base_col, lod)
+    glCallList(base + FISH_BODY)
+
+    wag = math.sin(t*7.0 + (0.0 if enemy else 1.2)) * 15.0
+    glPushMatrix()
+    glTranslatef(0, -size*0.75, 0)
+    glRotatef(90, 1, 0, 0)
+    glRotatef(wag, 0, 1, 0)
+    glCallList(base + FISH_TAIL)
+    glPopMatrix()
+
+    for sgn in (-1, 1):
+        glPushMatrix()
+        glTranslatef(size*0.35*sgn, size*0.1, 0)
+        flap = math.sin(t*5.0 + sgn)*18.0
+        glRotatef(90, 0,1,0)
+        glRotatef(flap, 0,0,1)
+        glCallList(base + FISH_FIN)
+        glPopMatrix()
+
+def draw_bunker(center, radius, height):
+    glPushMatrix()
+    glTranslatef(center[0], center[1], 0.0)
+    glRotatef(-90, 1, 0, 0)
+    glColor3f(0.36, 0.30, 0.26)
+    quad = shared_quadric()
+    gluCylinder(quad, radius, radius*0.92, height, 28, 1)
+    glColor3f(0.46, 0.38, 0.30)
+    gluDisk(quad, radius*0.92, radius, 28, 1)
+    glPopMatrix()
+
+# The sand heightmap (terrain.SAND, also used for the fish floor clamp) is
+# uploaded once as vertex/colour/index buffers and drawn with one call.
+class SandMesh:
+    def __init__(self, heightmap):
+        verts, cols, idx = cached_arrays("sand", heightmap.cache_params(), heightmap.mesh_arrays)
+        self.vbo, self.cbo, self.ibo = glGenBuffers(3)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, verts.nbytes, verts, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, self.cbo)
+        glBufferData(GL_ARRAY_BUFFER, cols.nbytes, cols, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, idx.nbytes, idx, GL_STATIC_DRAW)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        self.count = int(idx.size)
+
+    def draw(self):
+        glNormal3f(0.0, 0.0, 1.0)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glVertexPointer(3, GL_FLOAT, 0, None)
+        glBindBuffer(GL_ARRAY_BUFFER, self.cbo)
+        glColorPointer(3, GL_FLOAT, 0, None)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+        glDrawElements(GL_TRIANGLES, self.count, GL_UNSIGNED_INT, None)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+sand_mesh = None
+def build_sand():
+    global sand_mesh
+    sand_mesh = SandMesh(SAND)
+
+# The bunker, the bubbler and the glass never move. They are compiled into
+# one display list per pass, opaque and transparent, and recompiled only
+# when the tank constants they are built from differ from last time.
+def scenery_params():
+    return (tank.HALF, tank.TOP_Z, tank.BUB_POS,
+            tank.BUNKER_CENTER, tank.BUNKER_RADIUS, tank.BUNKER_HEIGHT)
+
+class StaticScenery:
+    OPAQUE, TRANSPARENT = 0, 1   # offsets into the list block
+
+    def __init__(self):
+        self.base = None
+        self.params = None
+        self.compiles = 0
+
+    def _current(self):
+        params = scenery_params()
+        if params == self.params:
+            return
+        half, top_z, bub_pos, center, radius, height = params
+        if self.base is None:
+            self.base = glGenLists(2)
+        glNewList(self.base + self.OPAQUE, GL_COMPILE)
+        draw_bunker(center, radius, height)
+        draw_bubbler(bub_pos)
+        glEndList()
+        glNewList(self.base + self.TRANSPARENT, GL_COMPILE)
+        draw_walls(half, top_z)
+        glEndList()
+        self.params = params
+        self.compiles += 1
+
+    def draw_opaque(self):
+        self._current()
+        glCallList(self.base + self.OPAQUE)
+
+    def draw_transparent(self):
+        # glass after everything else so the contents show through it
+        self._current()
+        blend_state(depth_write=False)
+        glCallList(self.base + self.TRANSPARENT)
+
+scenery = None
+
+FOOD_RADIUS = 6.0
+FOOD_TESS = [(12, 12), (8, 8), (5, 4)]   # per LOD level
+food_lists = {}
+
+def draw_food_pellet(lod=0):
+    lst = food_lists.get(lod)
+    if lst is None:
+        lst = food_lists[lod] = glGenLists(1)
+        glNewList(lst, GL_COMPILE)
+        glColor3f(0.9, 0.22, 0.22)
+        solid_sphere(FOOD_RADIUS, *FOOD_TESS[lod])
+        glEndList()
+    glCallList(lst)
+
+def draw_shield(radius):
+    glColor4f(0.3, 0.8, 1.0, 0.22)
+    blend_state()
+    solid_sphere(radius, 18, 16)
+
+def sphere_mesh(slices, stacks):
+    """Unit UV sphere as (vertices, triangle indices); normals equal the vertices."""
+    th = np.linspace(0.0, math.pi, stacks+1)[:, None]     # from +z down to -z
+    ph = np.linspace(0.0, math.tau, slices+1)[None, :]
+    verts = np.stack([np.sin(th)*np.cos(ph),
+                      np.sin(th)*np.sin(ph),
+                      np.cos(th)*np.ones_like(ph)], axis=-1).reshape(-1, 3)
+    i = np.arange(stacks)[:, None]*(slices+1) + np.arange(slices)[None, :]
+    i = i.ravel()
+    idx = np.stack([i, i+slices+1, i+1, i+1, i+slices+1, i+slices+2], axis=1).ravel()
+    return verts.astype(np.float32), idx.astype(np.uint32)
+
+class BubbleBatch:
+    """All visible bubbles merged into one vertex array and one draw call.
+
+    The unit sphere is scaled and offset per bubble with NumPy; normals and
+    indices only depend on the bubble count, so they are tiled once and
+    grown on demand.
+    """
+    def __init__(self, slices=12, stacks=10):
+        self.slices, self.stacks = slices, stacks
+        self.unit, self.unit_idx = sphere_mesh(slices, stacks)
+        self.count = 0
+        self.normals = self.indices = None
+
+    def _tile(self, n):
+        nv = len(self.unit)
+        self.normals = np.tile(self.unit, (n, 1))
+        self.indices = (self.unit_idx[None, :] + (np.arange(n, dtype=np.uint32)*nv)[:, None]).ravel()
+        self.count = n
+
+    def draw(self, bx, by, bz, br):
+        n = len(bx)
+        if n == 0:
+            return
+        if n > self.count:
+            self._tile(max(n, 2*self.count))
+        centers = np.stack([bx, by, bz], axis=1).astype(np.float32)
+        verts = (self.unit[None, :, :]*br.astype(np.float32)[:, None, None]
+                 + centers[:, None, :]).reshape(-1, 3)
+
+        glColor4f(0.85, 0.93, 1.0, 0.35)
+        blend_state()
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, verts)
+        glNormalPointer(GL_FLOAT, 0, self.normals)
+        glDrawElements(GL_TRIANGLES, n*len(self.unit_idx), GL_UNSIGNED_INT, self.indices)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+bubble_batch = None
+
+# ---------------- Input ----------------
+# Gameplay input goes to the world as held keys or posted events, so it can be
+# recorded and replayed; while replaying, only view keys are live.
+replaying = False
+
+def keyboardListener(key, x, y):
+    global first_person
+    k = key.decode("utf-8").lower() if isinstance(key, bytes) else key.lower()
+    if k == "f":
+        first_person = not first_person
+    elif k == "p":
+        toggle_profiler()
+    elif replaying:
+        return
+    elif k in MOVE_KEYS:
+        world.keys_down.add(k)
+    elif k == "c":
+        world.post("cheat")
+    elif k == "1":
+        world.post("diff", 0)
+    elif k == "2":
+        world.post("diff", 1)
+    elif k == "3":
+        world.post("diff", 2)
+    elif k == "r":
+        reset_game()
+
+def keyboardUp(key, x, y):
+    k = key.decode("utf-8").lower() if isinstance(key, bytes) else key.lower()
+    if k in world.keys_down:
+        world.keys_down.discard(k)
+
+def specialKeyListener(key, x, y):
+    global camera_pos, camera_pitch
+    if first_person:
+
+        if key == GLUT_KEY_LEFT:
+            if not replaying: world.post("turn", -5.0)
+        elif key == GLUT_KEY_RIGHT:
+            if not replaying: world.post("turn", 5.0)
+        elif key == GLUT_KEY_UP:
+            camera_pitch = clamp(camera_pitch + 3.0, -60.0, 60.0)
+        elif key == GLUT_KEY_DOWN:
+            camera_pitch = clamp(camera_pitch - 3.0, -60.0, 60.0)
+    else:
+
+        if key == GLUT_KEY_UP:
+            camera_pos[1] -= 30
+        elif key == GLUT_KEY_DOWN:
+            camera_pos[1] += 30
+        elif key == GLUT_KEY_LEFT:
+            camera_pos[0] -= 30
+        elif key == GLUT_KEY_RIGHT:
+            camera_pos[0] += 30
+
+def specialKeyUp(key, x, y):
+    pass
+
+# ---------------- Profiling ----------------
+# Phase timing is off (profiler None) unless the overlay is up or --profile-out
+# is streaming timings to disk.
+profiler = None
+show_profile = False
+
+def toggle_profiler():
+    global profiler, show_profile
+    show_profile = not show_profile
+    if show_profile and profiler is None:
+        profiler = Profiler()
+    elif not show_profile and profiler is not None and not profiler.streaming:
+        profiler = None
+    if sim is None:   # the sim thread would lap into the same profiler mid-frame
+        world.profiler = profiler
+
+# ---------------- Startup profile ----------------
+# With --startup-profile, FISH_TANK.main() marks each startup stage and the
+# first showScreen() prints how long each took, up to the first finished frame.
+startup_t0 = None      # perf_counter when the process started importing
+startup_marks = None   # [(stage, perf_counter)] while startup is being timed
+
+def startup_mark(stage):
+    if startup_marks is not None:
+        startup_marks.append((stage, time.perf_counter()))
+
+def startup_report(out=sys.stderr):
+    global startup_marks
+    marks, startup_marks = startup_marks, None
+    print(f"{'startup':<14}{'stage ms':>10}{'total ms':>10}", file=out)
+    prev = startup_t0
+    for stage, t in marks:
+        print(f"{stage:<14}{(t-prev)*1000.0:10.1f}{(t-startup_t0)*1000.0:10.1f}", file=out)
+        prev = t
+
+# ---------------- Adaptive quality ----------------
+# quality.QualityController watches frame times and picks a detail level.
+# The bubble caps are gameplay state, so they go to the world as a
+# "quality" event (recorded, and replayed instead of re-decided); the rest
+# only changes what this renderer draws.
+quality = None
+base_bubble_draw = None   # the world's bubble draw cap at full quality
+frame_busy = 0.0          # sim time this frame, from idle()
+last_frame_t = None
+lod_bias = 0
+MAX_LOD = len(FISH_TESS) - 1
+
+def lod(px):
+    return min(lod_level(px) + lod_bias, MAX_LOD)
+
+def quality_frame(busy):
+    global last_frame_t
+    now = time.perf_counter()
+    if last_frame_t is not None and quality.frame(now - last_frame_t, busy):
+        apply_quality()
+    last_frame_t = now
+
+def apply_quality():
+    global bubble_batch, lod_bias, plant_detail
+    lv = quality.current
+    if not replaying:
+        world.post("quality", max(1, round(base_bubble_draw*lv.bubbles)),
+                   max(1, round(world.bubble_cap*lv.bubbles)))
+    if (bubble_batch.slices, bubble_batch.stacks) != lv.sphere:
+        bubble_batch = BubbleBatch(*lv.sphere)
+    lod_bias = lv.lod_bias
+    if lv.plant != plant_detail:
+        plant_detail = lv.plant
+        if plant_meshes:
+            release_plant_meshes()   # recompiled at the new detail as they're drawn
+    if sim is not None:
+        sim.max_catchup = lv.max_ticks
+
+# ---------------- Game Loop ----------------
+last_time = None
+
+def reset_game():
+    global last_time, first_person, camera_pitch
+    world.post("reset")
+    last_time = None
+    first_person = False
+    camera_pitch = 0.0
+
+def setup_lighting(view):
+    """Light the scene; `view` is the camera the modelview was just set up for."""
+    gl_state.enable(GL_LIGHTING)
+    gl_state.enable(GL_LIGHT0)
+    gl_state.enable(GL_COLOR_MATERIAL)
+    gl_state.color_material(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE)
+    light_pos = (0.0, 0.0, 650.0, 1.0)
+    gl_state.light(GL_LIGHT0, GL_POSITION, light_pos, view)
+    gl_state.light(GL_LIGHT0, GL_DIFFUSE, (0.9, 0.9, 0.95, 1.0))
+    gl_state.light(GL_LIGHT0, GL_AMBIENT, (0.25, 0.28, 0.32, 1.0))
+
+# Rebuilt by setupCamera() every frame from the same parameters it hands to
+# gluPerspective/gluLookAt; draw_scene culls and picks LODs against it.
+frustum = None
+NEAR, FAR = 0.1, 6000.0
+
+def setupCamera():
+    """Set up projection and view; returns the (eye, at) the view looks along."""
+    global frustum
+    gl_state.projection(fovY, ASPECT, NEAR, FAR)
+    glLoadIdentity()
+
+    if first_person:
+        hero = scene.hero
+        yaw = math.radians(hero.yaw)
+        pitch = math.radians(camera_pitch)
+        dirx = math.cos(pitch) * math.sin(yaw)
+        diry = math.cos(pitch) * math.cos(yaw)
+        dirz = math.sin(pitch)
+        eye = (hero.x, hero.y, hero.z + 14.0)
+        at  = (hero.x + dirx*80.0, hero.y + diry*80.0, hero.z + 14.0 + dirz*80.0)
+    else:
+        eye = tuple(camera_pos)
+        at = (0, 0, 0)
+    gluLookAt(*eye, *at, 0, 0, 1)
+    frustum = Frustum(fovY, ASPECT, NEAR, FAR, eye, at, (0, 0, 1), WIN_H)
+    return eye, at
+
+def drawHUD():
+    gl_state.disable(GL_LIGHTING)
+    hero = scene.hero
+
+    y1 = WIN_H - 26
+    y2 = y1 - 20
+    y3 = y2 - 20
+
+    glColor3f(1,1,1)
+    draw_text(WIN_W//2 - 160, y1, "[1] Easy   [2] Medium   [3] Hard")
+    draw_text(WIN_W//2 - 40,  y2, f"Mode: {DIFFS[scene.diff_idx]}")
+
+    # Top-right: health
+    glColor3f(0.95,0.25,0.25)
+    draw_text(WIN_W - 180, y1, f"HEALTH: {hero.health:03d}")
+
+    # Top-left: controls on two lines
+    glColor3f(1,1,1)
+    draw_text(12, y1, "Move: WASD + Q/E   Cam: Arrows")
+    draw_text(12, y2, "FPV: F   Shield: C   Reset: R   Profile: P")
+
+    if quality:
+        draw_text(12, y3, f"Quality: {quality.label()}")
+
+    if hero_in_bunker(hero):
+        glColor3f(0.5,1.0,0.6)
+        draw_text(WIN_W//2 - 70, y3, "IN BUNKER (SAFE)")
+    if hero.is_dead:
+        glColor3f(1,0.2,0.2)
+        draw_text(WIN_W//2 - 120, WIN_H//2, "YOU DIED - Press R")
+
+def draw_profile_overlay(prof):
+    glColor3f(1.0, 0.9, 0.4)
+    y = WIN_H - 86
+    for line in prof.overlay_lines():
+        draw_text(12, y, line)
+        y -= 20
+    issued, filtered = gl_state.last
+    draw_text(12, y, f"gl state: {issued} calls, {filtered} redundant filtered")
+
+def draw_walls(s, top_z):
+    # both sides of the glass; blend_state(depth_write=False) when drawn
+    glColor4f(0.5, 0.8, 1.0, 0.12)
+
+    glBegin(GL_QUADS)
+
+    glVertex3f(-s, s, 0); glVertex3f(s, s, 0); glVertex3f(s, s, top_z); glVertex3f(-s, s, top_z)
+
+    glVertex3f(-s, -s, 0); glVertex3f(-s, -s, top_z); glVertex3f(s, -s, top_z); glVertex3f(s, -s, 0)
+
+    glVertex3f(s, -s, 0); glVertex3f(s, -s, top_z); glVertex3f(s, s, top_z); glVertex3f(s, s, 0)
+
+    glVertex3f(-s, -s, 0); glVertex3f(-s, s, 0); glVertex3f(-s, s, top_z); glVertex3f(-s, -s, top_z)
+    glEnd()
+
+def draw_school(enemies, hero, t):
+    """Enemies held as arrays (enemy_ai="numpy"): cull, LOD and facing in one go."""
+    x, y, z = enemies.x, enemies.y, enemies.z
+    px = frustum.spheres_px(x, y, z, ENEMY_SIZE*FISH_RADIUS)
+    vis = np.flatnonzero(px)
+    levels = np.minimum(lod_levels(px[vis]) + lod_bias, MAX_LOD).tolist()
+    yaw = np.degrees(np.arctan2(hero.x - x[vis], hero.y - y[vis])).tolist()
+    for ex, ey, ez, a, c, lv in zip(x[vis].tolist(), y[vis].tolist(), z[vis].tolist(), yaw,
+                                   enemies.col[vis].tolist(), levels):
+        glPushMatrix()
+        glTranslatef(ex, ey, ez)
+        glRotatef(a, 0,0,1)
+        draw_realistic_fish(ENEMY_SIZE, ENEMY_COLORS[c], t, enemy=True, lod=lv)
+        glPopMatrix()
+
+def draw_scene():
+    hero = scene.hero
+    prof = profiler
+    cull = frustum.sphere_px
+
+    opaque_state()
+    sand_mesh.draw()
+    if prof: prof.lap("sand")
+
+    scenery.draw_opaque()
+    if prof: prof.lap("scenery")
+
+   
+    if plant_owner != (world, scene.generation):
+        release_plant_meshes()
+    t = scene.time
+    for p in scene.plants:
+        top = p.height*1.2   # tallest a stalk can be
+        if cull(p.x, p.y, top*0.5, top*0.6 + 4.0):
+            draw_plant(p, t)
+    if prof: prof.lap("plants")
+
+  
+    for f in scene.foods:
+        x,y,z = f.pos(t)
+        px = cull(x, y, z, FOOD_RADIUS)
+        if not px:
+            continue
+        glPushMatrix()
+        glTranslatef(x,y,z)
+        draw_food_pellet(lod(px))
+        glPopMatrix()
+    if prof: prof.lap("food_draw")
+
+   
+    enemies = scene.enemies
+    if hasattr(enemies, "x"):   # a swarm, or a snapshot of one
+        draw_school(enemies, hero, t)
+        enemies = ()
+    for e in enemies:
+        px = cull(e.x, e.y, e.z, e.size*FISH_RADIUS)
+        if not px:
+            continue
+        glPushMatrix()
+        glTranslatef(e.x, e.y, e.z)
+        yaw = math.degrees(math.atan2(hero.x-e.x, hero.y-e.y))
+        glRotatef(yaw, 0,0,1)
+        draw_realistic_fish(e.size, e.col, t, enemy=True, lod=lod(px))
+        glPopMatrix()
+
+
+    if not first_person:
+        glPushMatrix()
+        glTranslatef(hero.x, hero.y, hero.z)
+        glRotatef(hero.yaw, 0,0,1)
+        draw_realistic_fish(hero.size, (0.95,0.55,0.25), t)
+        if hero.cheat:
+            draw_shield(hero.size*0.85)
+        glPopMatrix()
+    else:
+        if hero.cheat:
+            # shield at hero in FPV so it's visible around camera
+            glPushMatrix()
+            glTranslatef(hero.x, hero.y, hero.z + 14.0)
+            draw_shield(hero.size*0.9)
+            glPopMatrix()
+    if prof: prof.lap("fish")
+
+    # Bubbles (semi-transparent)
+    bx, by, bz, br = scene.bubbles.tail(scene.bubble_draw)  # the rest are stepped lazily
+    vis = frustum.spheres_visible(bx, by, bz, br)
+    bubble_batch.draw(bx[vis], by[vis], bz[vis], br[vis])
+    if prof: prof.lap("bubbles_draw")
+
+def idle():
+    global last_time, frame_busy
+    if sim is not None:   # the world steps itself; just keep drawing
+        glutPostRedisplay()
+        return
+    now = time.time()
+    dt = 0.016 if last_time is None else now - last_time
+    last_time = now
+    t0 = time.perf_counter()
+    world.advance(dt, quality.current.max_ticks if quality else None)
+    frame_busy += time.perf_counter() - t0
+    glutPostRedisplay()
+
+def render_frame(hud=True):
+    """Everything showScreen() draws, minus the buffer swap (for offscreen use)."""
+    global scene
+    scene = sim.view() if sim is not None else world
+    prof = profiler
+    if prof: prof.start()
+    gl_state.new_frame()
+    # the depth mask also gates the depth clear
+    gl_state.depth_mask(True)
+    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+    glViewport(0, 0, WIN_W, WIN_H)
+    setup_lighting(setupCamera())
+    if prof: prof.lap("setup")
+
+    #opaque-ish scene
+    draw_scene()
+
+    #transparent glass walls
+    scenery.draw_transparent()
+    if prof: prof.lap("walls")
+
+    # HUD
+    gl_state.disable(GL_LIGHTING)
+    if hud:
+        begin_hud()
+        drawHUD()
+        if show_profile and prof:
+            draw_profile_overlay(prof)
+        end_hud()
+    if prof: prof.lap("hud")
+
+# ---------------- Capture ----------------
+capture = None   # capture.FrameCapture while --capture is recording frames
+
+def stop_capture():
+    global capture
+    cap, capture = capture, None
+    if cap is not None:
+        cap.close()
+        fps = cap.fps()
+        rate = f", {fps:.1f} fps" if fps else ""
+        print(f"captured {cap.written} frames to {cap.path} ({cap.dropped} dropped{rate})", file=sys.stderr)
+
+def showScreen():
+    global frame_busy
+    t0 = time.perf_counter()
+    render_frame()
+    if capture: capture.grab()
+    busy, frame_busy = frame_busy + time.perf_counter() - t0, 0.0
+    glutSwapBuffers()
+    if quality: quality_frame(busy)
+    if profiler: profiler.end_frame()
+    if startup_marks is not None:
+        glFinish()
+        startup_mark("first frame")
+        startup_report()
+
+def initGL():
+    global bubble_batch, gl_state, scenery
+    from glstate import StateCache
+    gl_state = StateCache()
+    glClearColor(0.05, 0.15, 0.25, 1.0)  
+    gl_state.enable(GL_DEPTH_TEST)
+    bubble_batch = BubbleBatch()
+    scenery = StaticScenery()
+
+def run(capture_path=None):
+    """Open the window and hand over to GLUT; world (and the rest) must be set."""
+    global capture
+    glutInit()
+    glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB | GLUT_DEPTH)
+    glutInitWindowSize(WIN_W, WIN_H)
+    glutCreateWindow(b"Aquarium Hero Fish (v3)")
+    startup_mark("window")
+
+    initGL()
+    build_sand()
+    startup_mark("gl setup")
+
+    if capture_path:
+        from capture import FrameCapture
+        capture = FrameCapture(capture_path, WIN_W, WIN_H)
+        if bool(glutCloseFunc):   # freeglut: finish while the context still exists
+            glutCloseFunc(stop_capture)
+        atexit.register(stop_capture)
+
+    if sim is not None:
+        sim.start()
+        atexit.register(sim.stop)   # runs before the recording is finished
+    if quality and quality.level:
+        apply_quality()
+
+    glutDisplayFunc(showScreen)
+    glutIdleFunc(idle)
+    glutKeyboardFunc(keyboardListener)
+    glutKeyboardUpFunc(keyboardUp)
+    glutSpecialFunc(specialKeyListener)
+    glutSpecialUpFunc(specialKeyUp)
+
+    glutMainLoop()
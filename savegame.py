@@ -0,0 +1,242 @@
+"""Binary checkpoints of the complete World state.
+
+A save file is a small fixed header, a JSON block with the scalars (hero,
+timers, difficulty, config, both RNG states) and a table of packed arrays,
+then the arrays themselves, each 64-byte aligned:
+
+    magic "FTSV" | u16 version | u16 reserved | u32 JSON length | JSON | pad | arrays...
+
+Entities are stored column-wise (one float64 row per enemy, food or plant,
+the bubble pool's own slot arrays), so loading is a handful of frombuffer
+calls plus object construction. With mmap=True the arrays are mapped
+copy-on-write straight from the file; the bubble pool then runs on them
+without ever reading them into memory up front.
+
+    python savegame.py --scenario 10k      # save/load timings and a round-trip check
+    python world.py --ticks 36000 --save soak.ftsv
+    python world.py --ticks 36000 --load soak.ftsv   # resume the soak from there
+"""
+import json, random, struct, time
+import numpy as np
+
+from world import (World, Hero, Enemy, Food, Plant, ENEMY_SIZE, ENEMY_COLORS, FOOD_SIZE,
+                   TICK_DT)
+
+MAGIC = b"FTSV"
+SAVE_VERSION = 1
+PREAMBLE = struct.Struct("<4sHHI")
+ALIGN = 64
+
+HERO_FIELDS = ("x", "y", "z", "yaw", "speed", "vert_speed", "size", "health", "max_health",
+               "is_dead", "cheat", "last_dmg_time")
+WORLD_FIELDS = ("time", "accum", "ticks", "last_spawn_food", "diff_idx", "food_eaten",
+                "damage_taken", "bubble_draw", "bubble_limit")
+ENEMY_COLUMNS = ("x", "y", "z", "wander_dir", "wander_timer", "idle_dt", "speed")
+FOOD_COLUMNS = ("x", "y", "base_z", "phase")
+PLANT_COLUMNS = ("x", "y", "height", "phase")
+BUBBLE_FIELDS = ("x", "y", "z", "v", "r", "phase", "ox", "oy", "t", "src")
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+def _rows(objs, columns):
+    a = np.empty((len(objs), len(columns)))
+    for k, name in enumerate(columns):
+        a[:, k] = [getattr(o, name) for o in objs]
+    return a
+
+def pack(world):
+    """(header dict, {name: array}) for `world`."""
+    hero = world.hero
+    rng_version, rng_state, gauss = world.rng.getstate()
+    pool = world.bubbles
+    header = {
+        "seed": world.seed, "config": world.config(), "tick_dt": TICK_DT,
+        "world": {k: getattr(world, k) for k in WORLD_FIELDS},
+        "hero": {k: getattr(hero, k) for k in HERO_FIELDS},
+        "rng": [rng_version, list(rng_state), gauss],
+        "bubble_rng": pool.rng.bit_generator.state,
+        "bubble_pool": {"clock": pool.clock, "ticks": pool.ticks, "hot": pool.hot},
+    }
+    flow = world.flow
+    if flow is not None:
+        header["flow"] = {"target": flow.target, "settled": flow.settled}
+    swarm = world.swarm
+    if swarm is not None:
+        header["swarm_rng"] = swarm.rng.bit_generator.state
+        enemies = np.stack([getattr(swarm, k) for k in ENEMY_COLUMNS], axis=1)
+        enemy_col = swarm.col
+    else:
+        colour = {c: i for i, c in enumerate(ENEMY_COLORS)}
+        enemies = _rows(world.enemies, ENEMY_COLUMNS)
+        enemy_col = np.array([colour[e.col] for e in world.enemies], dtype=np.uint8)
+    arrays = {
+        "enemies": enemies.reshape(-1, len(ENEMY_COLUMNS)),
+        "enemy_col": enemy_col,
+        "foods": _rows(world.foods, FOOD_COLUMNS),
+        "plants": _rows(world.plants, PLANT_COLUMNS),
+        "plant_stalks": np.array([p.stalks for p in world.plants], dtype=np.uint8),
+        "stalk_heights": np.array([h for p in world.plants for h in p.stalk_heights]),
+    }
+    if flow is not None:
+        arrays["flow_cost"] = flow.cost
+    for name in BUBBLE_FIELDS:
+        arrays["bubble_" + name] = getattr(pool, name)
+    return header, arrays
+
+def save(world, path):
+    header, arrays = pack(world)
+    table, offset = {}, 0
+    for name, a in arrays.items():
+        a = np.ascontiguousarray(a)
+        arrays[name] = a
+        table[name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": offset}
+        offset = _align(offset + a.nbytes)
+    header["arrays"] = table
+    blob = json.dumps(header, separators=(",", ":")).encode()
+    data_start = _align(PREAMBLE.size + len(blob))
+    with open(path, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, SAVE_VERSION, 0, len(blob)))
+        f.write(blob)
+        for name, a in arrays.items():
+            f.seek(data_start + table[name]["offset"])
+            f.write(a.tobytes())
+        f.truncate(data_start + offset)
+
+def read(path, mmap=False):
+    """(header dict, {name: array}); arrays are copy-on-write maps with mmap=True."""
+    with open(path, "rb") as f:
+        magic, version, _, n = PREAMBLE.unpack(f.read(PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a fish tank save")
+        if version != SAVE_VERSION:
+            raise ValueError(f"unsupported save version {version!r}")
+        header = json.loads(f.read(n))
+        data_start = _align(PREAMBLE.size + n)
+        raw = None if mmap else f.read()
+        base = data_start if mmap else data_start - PREAMBLE.size - n
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype, shape = np.dtype(spec["dtype"]), tuple(spec["shape"])
+        count = int(np.prod(shape))
+        if mmap and count:
+            arrays[name] = np.memmap(path, dtype=dtype, mode="c", offset=base + spec["offset"],
+                                     shape=shape)
+        elif count:
+            arrays[name] = np.frombuffer(raw, dtype=dtype, count=count,
+                                         offset=base + spec["offset"]).reshape(shape).copy()
+        else:
+            arrays[name] = np.empty(shape, dtype=dtype)
+    return header, arrays
+
+def load(path, input_source=None, mmap=False):
+    """A World that carries on exactly where the saved one stopped."""
+    header, arrays = read(path, mmap)
+    config = dict({"flow": False}, **header["config"])   # saves from before flow fields
+    if header["tick_dt"] != TICK_DT:
+        raise ValueError(f"save was made at tick_dt {header['tick_dt']}, this build runs {TICK_DT}")
+    # Start from an empty world of the right shape, then fill it in.
+    empty = dict(config, target_foods=0, n_enemies=0, n_plants=0)
+    world = World(seed=header["seed"], input_source=input_source, **empty)
+    world.target_foods = config["target_foods"]
+    world.n_enemies = config["n_enemies"]
+    world.n_plants = config["n_plants"]
+    for k, v in header["world"].items():
+        setattr(world, k, v)
+    version, state, gauss = header["rng"]
+    world.rng.setstate((version, tuple(state), gauss))
+
+    hero = world.hero = Hero()
+    for k, v in header["hero"].items():
+        setattr(hero, k, v)
+
+    if world.swarm is not None:
+        world.swarm.set_state(arrays["enemies"], arrays["enemy_col"])
+        world.swarm.rng.bit_generator.state = header["swarm_rng"]
+    else:
+        enemies = []
+        for row, col in zip(arrays["enemies"].tolist(), arrays["enemy_col"].tolist()):
+            e = Enemy.__new__(Enemy)
+            e.x, e.y, e.z, e.wander_dir, e.wander_timer, e.idle_dt, e.speed = row
+            e.size = ENEMY_SIZE
+            e.col = ENEMY_COLORS[col]
+            enemies.append(e)
+        world.enemies = enemies
+
+    world.foods.clear()
+    for x, y, base_z, phase in arrays["foods"].tolist():
+        f = Food.__new__(Food)
+        f.x, f.y, f.base_z, f.phase, f.size = x, y, base_z, phase, FOOD_SIZE
+        world.foods.append(f)
+    world.food_grid.rebuild(world.foods)
+
+    plants, heights, at = [], arrays["stalk_heights"].tolist(), 0
+    for (x, y, height, phase), n in zip(arrays["plants"].tolist(), arrays["plant_stalks"].tolist()):
+        p = Plant.__new__(Plant)
+        p.x, p.y, p.height, p.phase, p.stalks = x, y, height, phase, n
+        p.stalk_heights = heights[at:at+n]
+        at += n
+        plants.append(p)
+    world.plants = plants
+
+    if "flow" in header:
+        flow = world.flow
+        flow.cost[...] = arrays["flow_cost"]
+        flow.target = tuple(header["flow"]["target"]) if header["flow"]["target"] else None
+        flow.settled = header["flow"]["settled"]
+        flow.refresh()
+
+    pool = world.bubbles
+    rng = np.random.default_rng()
+    rng.bit_generator.state = header["bubble_rng"]
+    pool.reset(rng)
+    n = len(arrays["bubble_x"])
+    if mmap and n >= pool.capacity:
+        # Run straight on the copy-on-write maps.
+        for name in BUBBLE_FIELDS:
+            setattr(pool, "_" + name, arrays["bubble_" + name])
+        pool.capacity = n
+    else:
+        if n > pool.capacity:
+            pool._alloc(n)
+        for name in BUBBLE_FIELDS:
+            getattr(pool, "_" + name)[:n] = arrays["bubble_" + name]
+    pool.n = n
+    bp = header["bubble_pool"]
+    pool.clock, pool.ticks, pool.hot = bp["clock"], bp["ticks"], bp["hot"]
+    return world
+
+# ---------------- Check ----------------
+def main(argv=None):
+    import argparse, os, tempfile
+    from bench import SCENARIOS, build_world
+    ap = argparse.ArgumentParser(description="Time save/load of a world and check the round trip.")
+    ap.add_argument("--scenario", choices=sorted(SCENARIOS), default="10k")
+    ap.add_argument("--ticks", type=int, default=120, help="ticks before saving and after loading")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out", help="keep the save here instead of a temp file")
+    args = ap.parse_args(argv)
+
+    path = args.out or os.path.join(tempfile.mkdtemp(), "world.ftsv")
+    w = build_world(SCENARIOS[args.scenario], args.seed)
+    for _ in range(args.ticks):
+        w.step()
+    t0 = time.perf_counter(); save(w, path); t1 = time.perf_counter()
+    for mmap in (False, True):
+        t2 = time.perf_counter(); w2 = load(path, input_source=w.input_source, mmap=mmap)
+        t3 = time.perf_counter()
+        same = w2.digest() == w.digest()
+        print(f"{args.scenario}: {os.path.getsize(path)/1e6:.2f} MB, save {(t1-t0)*1000:.1f} ms, "
+              f"load{' (mmap)' if mmap else ''} {(t3-t2)*1000:.1f} ms, state {'OK' if same else 'DIFFERS'}")
+    # The loaded world must also carry on identically; feed both the same input.
+    keys = random.Random(args.seed)
+    script = [(set(keys.sample("wasdqe", 2)), ()) for _ in range(args.ticks)]
+    for world in (w, w2):
+        feed = iter(script)
+        world.input_source = lambda: next(feed)
+        for _ in range(args.ticks):
+            world.step()
+    print(f"after {args.ticks} more ticks: {'OK' if w.digest() == w2.digest() else 'DIFFERS'}")
+
+if __name__ == "__main__":
+    main()
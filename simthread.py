@@ -0,0 +1,184 @@
+"""Run the World on its own thread and hand the renderer snapshots.
+
+SimThread steps the world at a fixed tick rate on a background thread,
+independent of how long frames take to draw. After every tick it publishes
+an immutable Snapshot of what the renderer needs, keeping the previous one
+as well (double-buffered: the pair is swapped with one assignment, so a
+reader always sees two complete ticks). view() blends those two so motion
+stays smooth when the frame rate and the tick rate don't line up.
+
+The sim still shares the interpreter lock with the renderer, but NumPy and
+GL calls release it, and a slow frame no longer slows the game down.
+"""
+import math, threading, time
+from collections import namedtuple
+import numpy as np
+
+from world import TICK_DT
+
+# A stall longer than this many ticks is dropped rather than caught up on.
+MAX_CATCHUP = 5
+
+HeroView = namedtuple("HeroView", "x y z yaw size health max_health is_dead cheat")
+EnemyView = namedtuple("EnemyView", "x y z size col")
+
+class EnemyArrays(namedtuple("EnemyArrays", "x y z col")):
+    """Copies of a swarm's position arrays and colour indices (enemy_ai="numpy")."""
+    __slots__ = ()
+
+class FoodView(namedtuple("FoodView", "x y base_z phase size")):
+    __slots__ = ()
+
+    def pos(self, t):
+        return self.x, self.y, self.base_z + math.sin(t*1.3 + self.phase)*8.0
+
+class BubbleView(namedtuple("BubbleView", "x y z r start")):
+    """Copies of the drawn bubbles' arrays; `start` is the pool slot of the first."""
+    __slots__ = ()
+
+    def tail(self, count):
+        s = slice(max(0, len(self.x) - count), len(self.x))
+        return self.x[s], self.y[s], self.z[s], self.r[s]
+
+class Snapshot(namedtuple("Snapshot", "wall ticks time generation diff_idx hero enemies "
+                                      "foods plants bubbles bubble_draw")):
+    """Everything FISH_TANK draws, frozen at the end of one tick.
+
+    Reads like the World it was taken from (hero, enemies, foods, plants,
+    bubbles.tail(), time, ...), so the draw code doesn't care which it gets.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def capture(cls, world, wall):
+        h = world.hero
+        hero = HeroView(h.x, h.y, h.z, h.yaw, h.size, h.health, h.max_health, h.is_dead, h.cheat)
+        swarm = world.swarm
+        if swarm is not None:
+            # whole arrays; going through EnemyRefs costs ~3 us an enemy
+            enemies = EnemyArrays(swarm.x.copy(), swarm.y.copy(), swarm.z.copy(), swarm.col.copy())
+        else:
+            enemies = tuple(EnemyView(e.x, e.y, e.z, e.size, e.col) for e in world.enemies)
+        foods = tuple(FoodView(f.x, f.y, f.base_z, f.phase, f.size) for f in world.foods)
+        pool = world.bubbles
+        bx, by, bz, br = pool.tail(world.bubble_draw)
+        bubbles = BubbleView(bx.copy(), by.copy(), bz.copy(), br.copy(),
+                             max(0, pool.n - world.bubble_draw))
+        # Plants never change within a generation and reset() makes a new
+        # list, so the list itself can be shared.
+        return cls(wall, world.ticks, world.time, world.generation, world.diff_idx, hero,
+                   enemies, foods, world.plants, bubbles, world.bubble_draw)
+
+def lerp_angle(a, b, t):
+    return a + ((b - a + 180.0) % 360.0 - 180.0) * t
+
+def blend(prev, cur, t):
+    """Snapshot between prev (t=0) and cur (t=1); cur's everything else.
+
+    Only positions that move continuously are blended: the hero, the
+    enemies, and bubbles that didn't pop and respawn in between. Food bobs
+    analytically, so it is simply evaluated at the blended time.
+    """
+    if prev is cur or t >= 1.0 or prev.generation != cur.generation:
+        return cur
+    ph, ch = prev.hero, cur.hero
+    hero = ch._replace(x=ph.x + (ch.x - ph.x)*t, y=ph.y + (ch.y - ph.y)*t,
+                       z=ph.z + (ch.z - ph.z)*t, yaw=lerp_angle(ph.yaw, ch.yaw, t))
+    enemies, pe = cur.enemies, prev.enemies
+    if isinstance(enemies, EnemyArrays):
+        if len(pe.x) == len(enemies.x):
+            enemies = enemies._replace(x=pe.x + (enemies.x - pe.x)*t, y=pe.y + (enemies.y - pe.y)*t,
+                                       z=pe.z + (enemies.z - pe.z)*t)
+    elif len(pe) == len(enemies):
+        enemies = tuple(c._replace(x=p.x + (c.x - p.x)*t, y=p.y + (c.y - p.y)*t,
+                                   z=p.z + (c.z - p.z)*t)
+                        for p, c in zip(prev.enemies, enemies))
+    # Bubbles pair up by pool slot: the drawn tail slides along on every
+    # spawn past bubble_draw, so equal indices aren't the same bubble.
+    bubbles, pb = cur.bubbles, prev.bubbles
+    lo = max(pb.start, bubbles.start)
+    hi = min(pb.start + len(pb.z), bubbles.start + len(bubbles.z))
+    if hi > lo:
+        c = slice(lo - bubbles.start, hi - bubbles.start)
+        p = slice(lo - pb.start, hi - pb.start)
+        rising = bubbles.z[c] >= pb.z[p]
+        xyz = []
+        for a, b in zip(pb[:3], bubbles[:3]):
+            b = b.copy()
+            b[c] = np.where(rising, a[p] + (b[c] - a[p])*t, b[c])
+            xyz.append(b)
+        bubbles = bubbles._replace(x=xyz[0], y=xyz[1], z=xyz[2])
+    return cur._replace(time=prev.time + (cur.time - prev.time)*t,
+                        hero=hero, enemies=enemies, bubbles=bubbles)
+
+class SimThread:
+    def __init__(self, world, tick_dt=TICK_DT):
+        self.world = world
+        self.tick_dt = tick_dt
+        self.max_catchup = MAX_CATCHUP   # ticks run back to back before giving up on lost time
+        self.clock = time.perf_counter
+        snap = Snapshot.capture(world, self.clock())
+        self._pair = (snap, snap)   # (previous, latest); replaced, never mutated
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="sim", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self.thread.is_alive():
+            self.thread.join()
+
+    def _run(self):
+        world, dt, clock = self.world, self.tick_dt, self.clock
+        next_t = clock()
+        while not self._stop.is_set():
+            now = clock()
+            if now < next_t:
+                self._stop.wait(next_t - now)
+                continue
+            n = 0
+            while next_t <= now and n < self.max_catchup:
+                world.step(dt)
+                next_t += dt
+                n += 1
+            if next_t <= now:   # fell too far behind; don't try to make it up
+                next_t = now + dt
+            self._pair = (self._pair[1], Snapshot.capture(world, clock()))
+
+    def view(self, now=None):
+        """The world as of one tick ago, blended to `now` (default: the clock)."""
+        prev, cur = self._pair
+        if now is None:
+            now = self.clock()
+        t = (now - cur.wall) / self.tick_dt
+        return blend(prev, cur, min(max(t, 0.0), 1.0))
+
+# ---------------- Check ----------------
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="Run the world on a sim thread against a slow fake renderer.")
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--frame-ms", type=float, default=40.0, help="simulated cost of one frame")
+    ap.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    from world import World
+    w = World(seed=args.seed)
+    w.hero.cheat = True
+    sim = SimThread(w).start()
+    t0 = time.perf_counter()
+    frames = 0
+    while time.perf_counter() - t0 < args.seconds:
+        v = sim.view()
+        time.sleep(args.frame_ms / 1000.0)   # stand-in for drawing v
+        frames += 1
+    sim.stop()
+    el = time.perf_counter() - t0
+    print(f"{frames} frames ({frames/el:.1f} fps) while the sim ran {w.ticks} ticks "
+          f"({w.ticks/el:.1f} ticks/s, target {1.0/sim.tick_dt:.0f}); last view t={v.time:.3f}")
+
+if __name__ == "__main__":
+    main()
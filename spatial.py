@@ -0,0 +1,193 @@
+"""Uniform-grid spatial hash for neighbour queries on the xy plane.
+
+Cells are `cell` units wide. With the cell size equal to the interaction
+radius, any two points closer than that radius sit in the same cell or in
+one of the eight around it, so a neighbour pass only looks at those.
+
+Items are identified by their index in the caller's list. The hash can be
+rebuilt wholesale each tick (moving enemies) or kept up to date with
+insert/move/swap_remove (food, which only appears and gets eaten).
+"""
+import math, random, time
+
+from tank import AQUARIUM_BOUNDS
+
+# Each cell checks itself plus these four neighbours; the other four are
+# covered when the neighbour checks back, so every pair is seen once.
+HALF_NEIGHBOURS = ((1, -1), (1, 0), (1, 1), (0, 1))
+
+class SpatialHash:
+    def __init__(self, cell):
+        self.cell = cell
+        self.inv_cell = 1.0 / cell
+        self.cells = {}
+        self.keys = []  # cell key of each indexed item
+
+    def __len__(self):
+        return len(self.keys)
+
+    def key(self, x, y):
+        return (math.floor(x*self.inv_cell), math.floor(y*self.inv_cell))
+
+    def clear(self):
+        self.cells.clear()
+        self.keys.clear()
+
+    def rebuild(self, objs):
+        """Index objs (anything with .x and .y) by list position."""
+        cells = {}
+        keys = []
+        inv = self.inv_cell
+        for i, o in enumerate(objs):
+            k = (math.floor(o.x*inv), math.floor(o.y*inv))
+            keys.append(k)
+            bucket = cells.get(k)
+            if bucket is None:
+                cells[k] = [i]
+            else:
+                bucket.append(i)
+        self.cells = cells
+        self.keys = keys
+
+    def insert(self, x, y):
+        """Index a new item appended to the end of the caller's list."""
+        i = len(self.keys)
+        k = self.key(x, y)
+        self.keys.append(k)
+        self.cells.setdefault(k, []).append(i)
+        return i
+
+    def move(self, i, x, y):
+        k = self.key(x, y)
+        old = self.keys[i]
+        if k != old:
+            self._unlink(old, i)
+            self.keys[i] = k
+            self.cells.setdefault(k, []).append(i)
+
+    def swap_remove(self, i):
+        """Drop item i; the last item takes index i, as in a list swap-remove.
+
+        Mirror it on the caller's list with `a[i] = a[-1]; a.pop()`.
+        """
+        last = len(self.keys) - 1
+        self._unlink(self.keys[i], i)
+        if i != last:
+            k = self.keys[last]
+            bucket = self.cells[k]
+            bucket[bucket.index(last)] = i
+            self.keys[i] = k
+        self.keys.pop()
+
+    def _unlink(self, k, i):
+        bucket = self.cells[k]
+        if len(bucket) == 1:
+            del self.cells[k]
+        else:
+            j = bucket.index(i)
+            bucket[j] = bucket[-1]
+            bucket.pop()
+
+    def query(self, x, y, r):
+        """Indices in every cell touching the square of half-size r around (x, y).
+
+        A superset of the items within r; callers do the exact distance test.
+        """
+        inv = self.inv_cell
+        cells = self.cells
+        x0 = math.floor((x-r)*inv); x1 = math.floor((x+r)*inv)
+        y0 = math.floor((y-r)*inv); y1 = math.floor((y+r)*inv)
+        for cx in range(x0, x1+1):
+            for cy in range(y0, y1+1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    yield from bucket
+
+    def pairs(self):
+        """Candidate (i, j) pairs in the same or adjacent cells, each once."""
+        cells = self.cells
+        for (cx, cy), ids in cells.items():
+            n = len(ids)
+            for a in range(n):
+                ia = ids[a]
+                for b in range(a+1, n):
+                    yield ia, ids[b]
+            for dx, dy in HALF_NEIGHBOURS:
+                other = cells.get((cx+dx, cy+dy))
+                if other:
+                    for i in ids:
+                        for j in other:
+                            yield i, j
+
+def separate_brute(objs, min_sep, bound):
+    """The original O(n^2) separation pass, kept as the benchmark baseline."""
+    for i in range(len(objs)):
+        for j in range(i+1, len(objs)):
+            ei, ej = objs[i], objs[j]
+            dx = ej.x - ei.x; dy = ej.y - ei.y
+            d2 = dx*dx + dy*dy
+            if d2 < (min_sep*min_sep) and d2 > 1e-4:
+                d = math.sqrt(d2)
+                push = (min_sep - d) * 0.5
+                nx, ny = dx/d, dy/d
+                ei.x -= nx*push; ei.y -= ny*push
+                ej.x += nx*push; ej.y += ny*push
+                bound(ei); bound(ej)
+
+# ---------------- Benchmark ----------------
+class _Dot:
+    def __init__(self, x, y):
+        self.x, self.y, self.z = x, y, 100.0
+
+class _Bound:
+    def __init__(self, half):
+        self.half = half
+
+    def __call__(self, o):
+        h = self.half
+        o.x = h if o.x > h else -h if o.x < -h else o.x
+        o.y = h if o.y > h else -h if o.y < -h else o.y
+
+def main(argv=None):
+    import argparse
+    from world import separate_enemies
+    ap = argparse.ArgumentParser(description="Per-tick cost of enemy separation vs enemy count.")
+    ap.add_argument("--counts", default="14,100,250,500,1000,2000,5000")
+    ap.add_argument("--ticks", type=int, default=20)
+    ap.add_argument("--warmup", type=int, default=30)
+    ap.add_argument("--density", type=float, default=200.0,
+                    help="enemies per tank-sized area; the arena grows with the count so "
+                         "the per-enemy neighbour load stays fixed (0 = always the real tank)")
+    ap.add_argument("--brute-max", type=int, default=1000,
+                    help="skip the O(n^2) baseline above this many enemies")
+    args = ap.parse_args(argv)
+
+    rng = random.Random(0)
+    grid = SpatialHash(35.0)
+    print(f"{'enemies':>8} {'grid ms':>10} {'us/enemy':>9} {'brute ms':>10}")
+    for n in [int(c) for c in args.counts.split(",")]:
+        half = AQUARIUM_BOUNDS
+        if args.density > 0:
+            half *= max(1.0, math.sqrt(n / args.density))
+        bound = _Bound(half)
+        pts = [(rng.uniform(-half, half), rng.uniform(-half, half)) for _ in range(n)]
+        row = []
+        for use_grid in (True, False):
+            if not use_grid and n > args.brute_max:
+                row.append(float("nan")); continue
+            objs = [_Dot(x, y) for x, y in pts]
+            # Let the crowd relax first: in the game separation runs every
+            # tick, so the timed ticks should see steady-state spacing.
+            for _ in range(args.warmup):
+                separate_enemies(objs, 35.0, grid, bound)
+            t0 = time.perf_counter()
+            for _ in range(args.ticks):
+                if use_grid:
+                    separate_enemies(objs, 35.0, grid, bound)
+                else:
+                    separate_brute(objs, 35.0, bound)
+            row.append((time.perf_counter() - t0) / args.ticks * 1000.0)
+        print(f"{n:>8} {row[0]:>10.3f} {row[0]*1000.0/n:>9.2f} {row[1]:>10.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""Structure-of-arrays enemy AI.
+
+EnemySwarm keeps every enemy's state in parallel NumPy arrays and runs the
+same rules as Enemy.wander/Enemy.chase and separate_enemies over all of them
+at once: the aggro test, wander timers and turns, chase steering, z-tracking,
+separation and the tank/sand clamp. World uses it with enemy_ai="numpy".
+
+Indexing a swarm gives an EnemyRef that reads (and writes) one slot, so
+code that only looks at a few enemies (the renderer, snapshots, digests)
+doesn't need to know which backend is running.
+"""
+import math, time
+import numpy as np
+
+from world import (AQUARIUM_BOUNDS, TOP_Z, GRID_LENGTH, ENEMY_SIZE, ENEMY_COLORS,
+                   FLOOR_CLEARANCE, SAND)
+from spatial import HALF_NEIGHBOURS
+
+ENEMY_SPEED = 90.0
+PAIR_OFFSETS = ((0, 0),) + HALF_NEIGHBOURS
+
+class EnemyRef:
+    """One enemy of a swarm, with the attributes of an Enemy."""
+    __slots__ = ("swarm", "i")
+
+    def __init__(self, swarm, i):
+        self.swarm, self.i = swarm, i
+
+    def _field(name):
+        def get(self):
+            return float(getattr(self.swarm, name)[self.i])
+        def set(self, v):
+            getattr(self.swarm, name)[self.i] = v
+        return property(get, set)
+
+    x = _field("x"); y = _field("y"); z = _field("z")
+    wander_dir = _field("wander_dir"); wander_timer = _field("wander_timer")
+    idle_dt = _field("idle_dt"); speed = _field("speed")
+    del _field
+
+    size = ENEMY_SIZE
+
+    @property
+    def col(self):
+        return ENEMY_COLORS[self.swarm.col[self.i]]
+
+class EnemySwarm:
+    FIELDS = ("x", "y", "z", "wander_dir", "wander_timer", "idle_dt", "speed")
+
+    def __init__(self, n, rng):
+        self.rng = rng
+        self.spawn(n)
+
+    def spawn(self, n):
+        """n enemies on a ring outside the tank's middle, as Enemy() places them."""
+        rng = self.rng
+        ang = rng.random(n) * 2*math.pi
+        rad = GRID_LENGTH*0.45 + rng.uniform(50, 200, n)
+        self.x = np.cos(ang)*rad
+        self.y = np.sin(ang)*rad
+        self.z = rng.uniform(50, 280, n)
+        self.speed = np.full(n, ENEMY_SPEED)
+        self.col = rng.integers(0, len(ENEMY_COLORS), n).astype(np.uint8)
+        self.wander_dir = rng.uniform(0, math.tau, n)
+        self.wander_timer = rng.uniform(1.0, 3.0, n)
+        self.idle_dt = np.zeros(n)   # always stepped; kept so it reads like an Enemy
+
+    def set_state(self, rows, col):
+        """Load FIELDS columns (n, len(FIELDS)) and colour indices, e.g. from a save."""
+        for k, name in enumerate(self.FIELDS):
+            setattr(self, name, np.array(rows[:, k], dtype=float))
+        self.col = np.array(col, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.x)
+
+    def __getitem__(self, i):
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        return EnemyRef(self, i % len(self))
+
+    def __iter__(self):
+        return (EnemyRef(self, i) for i in range(len(self)))
+
+    # ---------------- AI ----------------
+    def think(self, hero, dt, aggro_r, speed_scale, flow=None):
+        """Chase the hero inside aggro_r (along `flow` if given), wander everywhere else."""
+        x, y, z = self.x, self.y, self.z
+        to_hx = hero.x - x
+        to_hy = hero.y - y
+        d2 = to_hx*to_hx + to_hy*to_hy
+        chasing = d2 <= aggro_r*aggro_r
+        wandering = ~chasing
+
+        # wander: turn a little whenever the timer runs out
+        timer = self.wander_timer
+        timer[wandering] -= dt
+        turn = wandering & (timer <= 0.0)
+        k = int(turn.sum())
+        if k:
+            timer[turn] = self.rng.uniform(0.8, 2.2, k)
+            self.wander_dir[turn] += self.rng.uniform(-0.6, 0.6, k)
+        wd = self.wander_dir
+        wander_v = self.speed*0.6*dt
+        # chase: steer straight at the hero, drift toward its depth
+        dist = np.sqrt(d2) + 1e-6
+        chase_v = self.speed*speed_scale*dt / dist
+        chase_x, chase_y = to_hx*chase_v, to_hy*chase_v
+        if flow is not None:
+            fx, fy = flow.directions(x, y)
+            steer = (fx != 0.0) | (fy != 0.0)
+            step = self.speed*speed_scale*dt
+            chase_x = np.where(steer, fx*step, chase_x)
+            chase_y = np.where(steer, fy*step, chase_y)
+
+        x += np.where(chasing, chase_x, np.sin(wd)*wander_v)
+        y += np.where(chasing, chase_y, np.cos(wd)*wander_v)
+        z += np.where(chasing, np.clip(hero.z - z, -1.0, 1.0)*40.0*dt, np.sin(wd*0.7)*18.0*dt)
+        self.clamp()
+
+    def clamp(self):
+        x, y, z = self.x, self.y, self.z
+        np.clip(x, -AQUARIUM_BOUNDS, AQUARIUM_BOUNDS, out=x)
+        np.clip(y, -AQUARIUM_BOUNDS, AQUARIUM_BOUNDS, out=y)
+        np.clip(z, SAND.heights_at(x, y) + FLOOR_CLEARANCE, TOP_Z-10.0, out=z)
+
+    # ---------------- Neighbours ----------------
+    def pairs(self, cell):
+        """(i, j) index arrays of every pair in the same or adjacent cells.
+
+        The vectorised form of SpatialHash.pairs(): points are sorted by
+        cell, and each point is matched against the runs of points in its
+        own cell (only later ones) and in the four half-neighbour cells.
+        """
+        n = len(self)
+        if n < 2:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        cx = np.floor(self.x / cell).astype(np.int64)
+        cy = np.floor(self.y / cell).astype(np.int64)
+        cx -= cx.min() - 1
+        cy -= cy.min() - 1
+        width = int(cy.max()) + 2
+        key = cx*width + cy
+        order = np.argsort(key, kind="stable")
+        cells, start, count = np.unique(key[order], return_index=True, return_counts=True)
+        rank = np.empty(n, dtype=np.intp)
+        rank[order] = np.arange(n)
+        out_i, out_j = [], []
+        for dx, dy in PAIR_OFFSETS:
+            nkey = key + dx*width + dy
+            pos = np.minimum(np.searchsorted(cells, nkey), len(cells) - 1)
+            found = cells[pos] == nkey
+            first = start[pos]
+            num = np.where(found, count[pos], 0)
+            if dx == 0 and dy == 0:   # own cell: only the points after this one
+                num = first + num - rank - 1
+                first = rank + 1
+            total = int(num.sum())
+            if not total:
+                continue
+            ii = np.repeat(np.arange(n), num)
+            seg = np.repeat(np.cumsum(num) - num, num)
+            jj = order[np.repeat(first, num) + np.arange(total) - seg]
+            out_i.append(ii); out_j.append(jj)
+        if not out_i:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        return np.concatenate(out_i), np.concatenate(out_j)
+
+    def separate(self, min_sep):
+        """separate_enemies() for the whole swarm.
+
+        All overlapping pairs push at once from the same positions (rather
+        than one after another), each enemy moving by the sum of its pushes.
+        """
+        i, j = self.pairs(min_sep)
+        if not len(i):
+            return
+        x, y = self.x, self.y
+        dx = x[j] - x[i]; dy = y[j] - y[i]
+        d2 = dx*dx + dy*dy
+        hit = (d2 < min_sep*min_sep) & (d2 > 1e-4)
+        if not hit.any():
+            return
+        i, j, dx, dy = i[hit], j[hit], dx[hit], dy[hit]
+        d = np.sqrt(d2[hit])
+        push = (min_sep - d) * 0.5 / d
+        px, py = dx*push, dy*push
+        n = len(self)
+        x += np.bincount(j, px, n) - np.bincount(i, px, n)
+        y += np.bincount(j, py, n) - np.bincount(i, py, n)
+        self.clamp()
+
+    def near(self, x, y, r):
+        """Indices of enemies within the square of half-size r around (x, y)."""
+        return np.flatnonzero((np.abs(self.x - x) <= r) & (np.abs(self.y - y) <= r)).tolist()
+
+    def touching(self, x, y, z, r):
+        """Whether any enemy's body (0.7 size) is within r of the point."""
+        reach = r + ENEMY_SIZE*0.7
+        d2 = (self.x - x)**2 + (self.y - y)**2 + (self.z - z)**2
+        return bool((d2 < reach*reach).any())
+
+# ---------------- Benchmark ----------------
+def main(argv=None):
+    import argparse
+    from world import World
+    from profiler import Profiler
+    ap = argparse.ArgumentParser(description="Time enemy AI, per-object vs NumPy, at various counts.")
+    ap.add_argument("--counts", default="14,500,5000", help="comma-separated enemy counts")
+    ap.add_argument("--ticks", type=int, default=120)
+    ap.add_argument("--difficulty", type=int, default=2)
+    ap.add_argument("--objects-max", type=int, default=5000,
+                    help="skip the per-object backend above this many enemies")
+    args = ap.parse_args(argv)
+
+    print(f"{'enemies':>8} {'backend':>8} {'tick ms':>9} {'enemy ms':>9}")
+    for n in [int(c) for c in args.counts.split(",")]:
+        for backend in ("objects", "numpy"):
+            if backend == "objects" and n > args.objects_max:
+                continue
+            w = World(seed=1, n_enemies=n, difficulty=args.difficulty, enemy_ai=backend)
+            w.hero.cheat = True
+            # swim back and forth so some enemies chase and some wander
+            w.input_source = lambda w=w: (("d",) if (w.ticks // 90) % 2 else ("a",), ())
+            w.profiler = prof = Profiler()
+            t0 = time.perf_counter()
+            for _ in range(args.ticks):
+                w.step()
+            el = (time.perf_counter() - t0) / args.ticks
+            enemy = sum(prof.frame[p] for p in ("enemy_ai", "separation", "collision")) / args.ticks
+            print(f"{n:>8} {backend:>8} {el*1000:9.3f} {enemy*1000:9.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Headless difficulty/balance sweeps over a process pool.
+
+Every combination of the swept parameters is run for each seed as its own
+headless game, with a scripted hero, on a ProcessPoolExecutor using all
+cores. Per-run survival time, damage taken and food eaten are merged into
+one summary table (mean over seeds). Nothing here touches OpenGL.
+
+    python sweep.py --difficulty 0,1,2 --enemies 14,40,100 --seeds 8
+    python sweep.py --speed-scale 0.8,1.0,1.2 --aggro-range 250,300 --out sweep.csv
+"""
+import csv, itertools, math, os, sys, time
+from concurrent.futures import ProcessPoolExecutor
+
+from world import World, DIFFS, TICK_DT, TARGET_FOODS, N_ENEMIES
+
+# Hero policy tuning
+FLEE_RADIUS = 140.0
+FOOD_SEARCH_RADII = (150.0, 400.0)
+
+def seek_food_policy(world):
+    """Input source for a simple scripted hero.
+
+    Swims away from the nearest enemy when one is within FLEE_RADIUS,
+    otherwise toward the nearest food pellet, matching its depth with Q/E.
+    """
+    def source():
+        hero = world.hero
+        hx, hy, hz = hero.x, hero.y, hero.z
+        tx = ty = None
+        threat, best = None, FLEE_RADIUS*FLEE_RADIUS
+        for i in world.enemies_near(hx, hy, FLEE_RADIUS):
+            e = world.enemies[i]
+            d2 = (e.x-hx)**2 + (e.y-hy)**2
+            if d2 < best:
+                threat, best = e, d2
+        if threat is not None:
+            tx, ty, tz = 2*hx - threat.x, 2*hy - threat.y, hz
+        else:
+            target = nearest_food(world, hx, hy)
+            if target is None:
+                return (), ()
+            tx, ty, tz = target.pos(world.time)
+        keys = []
+        dx, dy = tx - hx, ty - hy
+        if abs(dx) > 4.0: keys.append("d" if dx > 0 else "a")
+        if abs(dy) > 4.0: keys.append("w" if dy > 0 else "s")
+        if abs(tz - hz) > 6.0: keys.append("q" if tz > hz else "e")
+        return keys, ()
+    return source
+
+def nearest_food(world, x, y):
+    foods = world.foods
+    for r in FOOD_SEARCH_RADII:
+        cand = list(world.food_grid.query(x, y, r))
+        if cand:
+            break
+    else:
+        cand = range(len(foods))
+    best, best_d2 = None, math.inf
+    for i in cand:
+        f = foods[i]
+        d2 = (f.x-x)**2 + (f.y-y)**2
+        if d2 < best_d2:
+            best, best_d2 = f, d2
+    return best
+
+def run_one(job):
+    """One headless game; runs in a worker process."""
+    params, seed, max_ticks = job
+    world = World(seed=seed, **params)
+    world.input_source = seek_food_policy(world)
+    t0 = time.perf_counter()
+    while world.ticks < max_ticks and not world.hero.is_dead:
+        world.step()
+    return {**params, "seed": seed, "survived_s": round(world.ticks*TICK_DT, 3),
+            "died": world.hero.is_dead, "damage_taken": world.damage_taken,
+            "food_eaten": world.food_eaten, "wall_s": round(time.perf_counter() - t0, 3)}
+
+def summarize(results, keys):
+    groups = {}
+    for r in results:
+        groups.setdefault(tuple(r[k] for k in keys), []).append(r)
+    rows = []
+    for combo, runs in sorted(groups.items(), key=lambda kv: [(v is None, v) for v in kv[0]]):
+        n = len(runs)
+        rows.append({**dict(zip(keys, combo)), "runs": n,
+                     "deaths": sum(r["died"] for r in runs),
+                     "survived_s": round(sum(r["survived_s"] for r in runs) / n, 2),
+                     "damage_taken": round(sum(r["damage_taken"] for r in runs) / n, 2),
+                     "food_eaten": round(sum(r["food_eaten"] for r in runs) / n, 2)})
+    return rows
+
+def print_table(rows, out=sys.stdout):
+    if not rows:
+        return
+    cols = list(rows[0])
+    width = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in cols}
+    print("  ".join(c.rjust(width[c]) for c in cols), file=out)
+    for r in rows:
+        print("  ".join(str(r[c]).rjust(width[c]) for c in cols), file=out)
+
+def int_list(s):
+    return [int(v) for v in s.split(",")]
+
+def float_list(s):
+    return [float(v) for v in s.split(",")]
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="Sweep difficulty/balance parameters over headless games.")
+    ap.add_argument("--difficulty", type=int_list, default=[0, 1, 2], help="difficulty indices")
+    ap.add_argument("--speed-scale", type=float_list, default=[None],
+                    help="enemy chase speed scales (default: the difficulty's)")
+    ap.add_argument("--aggro-range", type=float_list, default=[None],
+                    help="enemy aggro ranges (default: the difficulty's)")
+    ap.add_argument("--enemies", type=int_list, default=[N_ENEMIES])
+    ap.add_argument("--foods", type=int_list, default=[TARGET_FOODS])
+    ap.add_argument("--seeds", type=int, default=4, help="runs per parameter combination")
+    ap.add_argument("--max-seconds", type=float, default=300.0, help="sim-time cap per run")
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--out", help="write every run to this CSV as well")
+    args = ap.parse_args(argv)
+    for d in args.difficulty:
+        if not 0 <= d < len(DIFFS):
+            ap.error(f"--difficulty must be 0..{len(DIFFS)-1}, not {d}")
+
+    grid = {"difficulty": args.difficulty, "speed_scale": args.speed_scale,
+            "aggro_range": args.aggro_range, "n_enemies": args.enemies, "target_foods": args.foods}
+    keys = list(grid)
+    combos = [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+    max_ticks = int(args.max_seconds / TICK_DT)
+    jobs = [(params, seed, max_ticks) for params in combos for seed in range(args.seeds)]
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(run_one, jobs, chunksize=max(1, len(jobs) // (4*args.workers))))
+    print(f"{len(jobs)} runs on {args.workers} workers in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+    if args.out:
+        with open(args.out, "w", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=list(results[0]))
+            w.writeheader()
+            w.writerows(results)
+    print_table(summarize(results, keys))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+"""Tank dimensions shared by the simulation, its subsystems and the renderer."""
+
+GRID_LENGTH = 1200
+HALF = GRID_LENGTH*0.5
+AQUARIUM_BOUNDS = HALF - 30.0
+TOP_Z = 420.0
+
+# Bubbler / Pump
+BUB_POS = (HALF-80.0, -HALF+80.0, 0.0)
+
+# Bunker (safe region)
+BUNKER_CENTER = (220.0, -180.0)
+BUNKER_RADIUS = 120.0
+BUNKER_HEIGHT = 90.0
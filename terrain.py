@@ -0,0 +1,124 @@
+"""Sand floor heightmap.
+
+The sand surface is sampled once into a NumPy grid at a configurable
+resolution, which the renderer uploads as an indexed vertex buffer.
+Gameplay asks height_at() (heights_at() for arrays) for the floor under a
+point. That is the analytic surface itself: in Python, scalar trig is
+cheaper than finding and interpolating a grid cell, and the drawn
+triangles are within a few hundredths of a unit of it.
+"""
+import math
+import numpy as np
+
+from tank import GRID_LENGTH, HALF
+
+SAND_STEPS = 64   # cells per side
+SAND_COLORS = ((0.86, 0.82, 0.67), (0.84, 0.80, 0.65))
+SAND_VERSION = 1   # bump when sand_height() or the mesh layout changes (cache key)
+
+_sin, _cos = math.sin, math.cos
+
+def sand_height(x, y):
+    """The analytic sand surface; works on scalars and NumPy arrays."""
+    return 2.0*np.sin(x*0.01) + 1.5*np.cos(y*0.012) + 1.0*np.sin((x+y)*0.007)
+
+class Heightmap:
+    def __init__(self, steps=SAND_STEPS):
+        self.steps = steps
+        self.cell = GRID_LENGTH / steps
+        self.inv_cell = 1.0 / self.cell
+        ax = np.linspace(-HALF, HALF, steps+1)
+        self.heights = sand_height(ax[:, None], ax[None, :])   # [i, j] = h(x_i, y_j)
+
+    def height_at(self, x, y):
+        """Height of the sand at (x, y) for gameplay, one point at a time.
+
+        This runs per entity per tick, so it evaluates the analytic surface
+        with math's scalar trig, which is cheaper in Python than looking up
+        and interpolating the grid. The drawn triangles stay within
+        max_error() of it.
+        """
+        return 2.0*_sin(x*0.01) + 1.5*_cos(y*0.012) + 1.0*_sin((x+y)*0.007)
+
+    def heights_at(self, x, y):
+        """Vectorised height_at for NumPy arrays of points."""
+        return sand_height(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+
+    def mesh_heights_at(self, x, y):
+        """Height of the drawn (interpolated) surface at arrays of points."""
+        n = self.steps
+        u = (np.asarray(x) + HALF) * self.inv_cell
+        v = (np.asarray(y) + HALF) * self.inv_cell
+        i = np.clip(np.floor(u).astype(int), 0, n-1)
+        j = np.clip(np.floor(v).astype(int), 0, n-1)
+        fu = np.clip(u - i, 0.0, 1.0)
+        fv = np.clip(v - j, 0.0, 1.0)
+        H = self.heights
+        h00, h10, h01, h11 = H[i, j], H[i+1, j], H[i, j+1], H[i+1, j+1]
+        # Same split as the mesh: (00, 10, 11) below the diagonal, (00, 11, 01) above.
+        lower = h00 + fu*(h10 - h00) + fv*(h11 - h10)
+        upper = h00 + fv*(h01 - h00) + fu*(h11 - h01)
+        return np.where(fu >= fv, lower, upper)
+
+    def max_error(self, points=100000, seed=0):
+        """Largest gap between the drawn surface and height_at over random points."""
+        xs, ys = np.random.default_rng(seed).uniform(-HALF, HALF, (2, points))
+        return float(np.abs(self.mesh_heights_at(xs, ys) - sand_height(xs, ys)).max())
+
+    def mesh_arrays(self):
+        """(vertices, colours, triangle indices) for an indexed draw.
+
+        Vertices are shared between cells. The two sand tones alternate per
+        vertex instead of per triangle, since shared vertices can't carry
+        a per-triangle colour.
+        """
+        n = self.steps
+        ax = np.linspace(-HALF, HALF, n+1)
+        gx, gy = np.meshgrid(ax, ax, indexing="ij")
+        verts = np.stack([gx, gy, self.heights], axis=-1).reshape(-1, 3).astype(np.float32)
+        checker = (np.add.outer(np.arange(n+1), np.arange(n+1)) & 1).ravel()
+        cols = np.asarray(SAND_COLORS, dtype=np.float32)[checker]
+        i, j = np.meshgrid(np.arange(n), np.arange(n), indexing="ij")
+        v00 = (i*(n+1) + j).ravel()
+        v10 = v00 + (n+1); v01 = v00 + 1; v11 = v10 + 1
+        idx = np.stack([v00, v10, v11, v00, v11, v01], axis=1).ravel().astype(np.uint32)
+        return verts, cols, idx
+
+    def cache_params(self):
+        """Everything mesh_arrays() depends on, for geomcache."""
+        return {"version": SAND_VERSION, "steps": self.steps, "grid_length": GRID_LENGTH,
+                "colors": SAND_COLORS}
+
+# Shared by the simulation (floor clamping) and the renderer (sand mesh).
+SAND = Heightmap(SAND_STEPS)
+
+def main(argv=None):
+    import argparse, time
+    ap = argparse.ArgumentParser(description="Check and time the sand heightmap.")
+    ap.add_argument("--steps", type=int, default=SAND_STEPS, help="cells per side")
+    ap.add_argument("--points", type=int, default=100000)
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    hm = Heightmap(args.steps)
+    verts, cols, idx = hm.mesh_arrays()
+    t1 = time.perf_counter()
+    rng = np.random.default_rng(0)
+    xs, ys = rng.uniform(-HALF, HALF, (2, args.points))
+    pts = list(zip(xs.tolist(), ys.tolist()))
+    t2 = time.perf_counter()
+    hs = [hm.height_at(x, y) for x, y in pts]
+    t3 = time.perf_counter()
+    trig = [sand_height(x, y) for x, y in pts[:args.points//10]]   # the NumPy formula per point
+    t4 = time.perf_counter()
+    bulk = hm.heights_at(xs, ys)
+    t5 = time.perf_counter()
+    err = float(np.abs(np.asarray(hs) - bulk).max())
+    print(f"{args.steps}x{args.steps}: {len(verts)} verts, {len(idx)//3} tris built in {(t1-t0)*1000:.1f} ms; "
+          f"drawn surface within {hm.max_error():.4f} of height_at")
+    print(f"height_at: {(t3-t2)/len(hs)*1e9:.0f} ns/query (NumPy formula per point "
+          f"{(t4-t3)/len(trig)*1e9:.0f} ns); heights_at: {(t5-t4)/len(bulk)*1e9:.1f} ns/point, "
+          f"max difference {err:.2g}")
+
+if __name__ == "__main__":
+    main()
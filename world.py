@@ -0,0 +1,589 @@
+"""Headless simulation core for THE FISH TANK.
+
+All gameplay state lives on a World object that is stepped at a fixed dt.
+Nothing in this module imports OpenGL, so it can run on build boxes for
+soak tests and tuning; FISH_TANK.py only reads the world to draw it.
+"""
+import random, math, time, hashlib
+from collections import deque
+import numpy as np
+
+from tank import (GRID_LENGTH, HALF, AQUARIUM_BOUNDS, TOP_Z, BUB_POS,
+                  BUNKER_CENTER, BUNKER_RADIUS, BUNKER_HEIGHT)
+from bubbles import BubblePool
+from spatial import SpatialHash
+from terrain import SAND
+from flow import FlowField
+
+# Fixed simulation step; frames longer than MAX_FRAME_DT are clamped like
+# the old idle() did so a stall never turns into a burst of catch-up ticks.
+TICK_DT = 1.0/60.0
+MAX_FRAME_DT = 0.05
+
+# ---------------- Utility ----------------
+def clamp(x, lo, hi):
+    return lo if x < lo else hi if x > hi else x
+
+# Fish keep this far above the sand under them.
+FLOOR_CLEARANCE = 20.0
+
+def clamp_to_aquarium(obj):
+    obj.x = clamp(obj.x, -AQUARIUM_BOUNDS, AQUARIUM_BOUNDS)
+    obj.y = clamp(obj.y, -AQUARIUM_BOUNDS, AQUARIUM_BOUNDS)
+    obj.z = clamp(obj.z, SAND.height_at(obj.x, obj.y) + FLOOR_CLEARANCE, TOP_Z-10.0)
+
+def dist2(ax, ay, bx, by):
+    return (ax-bx)*(ax-bx) + (ay-by)*(ay-by)
+
+def dist3(ax, ay, az, bx, by, bz):
+    return math.sqrt((ax-bx)**2 + (ay-by)**2 + (az-bz)**2)
+
+# ---------------- Entities ----------------
+class Hero:
+    def __init__(self):
+        self.x, self.y, self.z = 0.0, -150.0, 80.0
+        self.yaw = 0.0
+        self.speed = 240.0
+        self.vert_speed = 160.0
+        self.size = 50.0
+        self.health = 100
+        self.max_health = 100
+        self.is_dead = False
+        self.cheat = False
+        self.last_dmg_time = 0.0
+
+    def forward_vec(self):
+        r = math.radians(self.yaw)
+        return math.sin(r), math.cos(r)
+
+    def move_dir(self, dx, dy, dt):
+        if self.is_dead: return
+        mag = math.hypot(dx, dy)
+        if mag > 1e-6:
+            dx /= mag; dy /= mag
+        self.x += dx * self.speed * dt
+        self.y += dy * self.speed * dt
+        clamp_to_aquarium(self)
+
+    def move_vert(self, dz, dt):
+        if self.is_dead: return
+        self.z += dz * self.vert_speed * dt
+        clamp_to_aquarium(self)
+
+ENEMY_SIZE = 26.0
+ENEMY_COLORS = ((0.12,0.18,0.28), (0.10,0.20,0.18), (0.16,0.14,0.24), (0.18,0.22,0.30))
+
+class Enemy:
+    def __init__(self, rng=random):
+        ang = rng.random() * 2*math.pi
+        rad = GRID_LENGTH*0.45 + rng.uniform(50,200)
+        self.x = math.cos(ang)*rad
+        self.y = math.sin(ang)*rad
+        self.z = rng.uniform(50, 280)
+        self.speed = 90.0
+        self.size = ENEMY_SIZE
+
+        self.col = rng.choice(ENEMY_COLORS)
+        self.wander_dir = rng.uniform(0, math.tau)
+        self.wander_timer = rng.uniform(1.0, 3.0)
+        self.idle_dt = 0.0   # wander time owed while throttled far from the hero
+
+    def wander(self, dt, rng=random):
+        self.wander_timer -= dt
+        if self.wander_timer <= 0.0:
+            self.wander_timer = rng.uniform(0.8, 2.2)
+            self.wander_dir += rng.uniform(-0.6, 0.6)
+        vx = math.sin(self.wander_dir) * (self.speed*0.6)
+        vy = math.cos(self.wander_dir) * (self.speed*0.6)
+        self.x += vx * dt
+        self.y += vy * dt
+        self.z += math.sin(self.wander_dir*0.7) * 18.0 * dt
+        clamp_to_aquarium(self)
+
+    def chase(self, hero, dt, difficulty_scale, flow=None):
+        to_hx = hero.x - self.x
+        to_hy = hero.y - self.y
+        to_hz = hero.z - self.z
+        self.z += clamp(to_hz, -1, 1) * 40.0 * dt
+        dist = math.sqrt(to_hx*to_hx + to_hy*to_hy) + 1e-6
+        ux, uy = to_hx / dist, to_hy / dist
+        if flow is not None:
+            # around the bunker, off the glass; straight at the hero up close
+            ux, uy = flow.direction(self.x, self.y) or (ux, uy)
+        vx = ux * self.speed * difficulty_scale
+        vy = uy * self.speed * difficulty_scale
+        self.x += vx * dt
+        self.y += vy * dt
+        clamp_to_aquarium(self)
+
+# Food & Deco
+FOOD_SIZE = 10.0
+# Food only moves in z, so its xy grid is updated on spawn/eat, never rebuilt.
+FOOD_CELL = 64.0
+
+class Food:
+    __slots__ = ("x", "y", "base_z", "phase", "size")
+
+    def __init__(self, rng=random):
+        self.roll(rng)
+
+    def roll(self, rng=random):
+        """(Re)place the pellet; a recycled Food is as good as a new one."""
+        self.x = rng.uniform(-GRID_LENGTH*0.45, GRID_LENGTH*0.45)
+        self.y = rng.uniform(-GRID_LENGTH*0.45, GRID_LENGTH*0.45)
+        self.base_z = rng.uniform(60, 260)
+        self.phase = rng.random()*math.tau
+        self.size = FOOD_SIZE
+
+    def pos(self, t):
+        z = self.base_z + math.sin(t*1.3 + self.phase)*8.0
+        return self.x, self.y, z
+
+class FoodPool:
+    """Free list of eaten Food records, reused for new pellets.
+
+    `allocations` counts every Food ever constructed here; once the pool
+    holds enough records it stops moving, however much food is eaten.
+    """
+    def __init__(self):
+        self.free = []
+        self.allocations = 0
+
+    def take(self, rng):
+        if self.free:
+            f = self.free.pop()
+            f.roll(rng)
+            return f
+        self.allocations += 1
+        return Food(rng)
+
+    def give(self, f):
+        self.free.append(f)
+
+class Plant:
+    def __init__(self, x, y, rng=random):
+        self.x, self.y = x, y
+        self.height = rng.uniform(50, 110)
+        self.stalks = rng.randint(3,6)
+        self.phase = rng.random()*math.tau
+        # Rolled once so stalks keep their height instead of flickering.
+        self.stalk_heights = [self.height * (0.8 + 0.4*rng.random()) for _ in range(self.stalks)]
+
+# Difficulty
+DIFFS = ["EASY", "MEDIUM", "HARD"]
+DIFF_SPEED_SCALE = [0.6, 1.0, 1.6]
+DIFF_AGGRO_RANGE = [220.0, 280.0, 340.0]
+
+# Bunker (safe region)
+def hero_in_bunker(hero):
+    dx = hero.x - BUNKER_CENTER[0]
+    dy = hero.y - BUNKER_CENTER[1]
+    on_xy = dx*dx + dy*dy <= BUNKER_RADIUS*BUNKER_RADIUS
+    in_z = 0.0 <= hero.z <= BUNKER_HEIGHT
+    return on_xy and in_z
+
+# Enemies closer than this on the xy plane push each other apart.
+MIN_SEP = 35.0
+def separate_enemies(enemies, min_sep, grid, bound=None):
+    """Push overlapping enemies apart, comparing only spatial-hash neighbours.
+
+    The grid is rebuilt from current positions first; its cell size should be
+    min_sep so no overlapping pair can be missed. Pushed enemies are moved in
+    the grid afterwards, so it stays valid for queries later in the tick.
+    `bound` keeps pushed enemies in the tank and defaults to clamp_to_aquarium.
+    """
+    if bound is None:
+        bound = clamp_to_aquarium
+    grid.rebuild(enemies)
+    min_sep2 = min_sep*min_sep
+    pushed = set()
+    for i, j in grid.pairs():
+        ei, ej = enemies[i], enemies[j]
+        dx = ej.x - ei.x; dy = ej.y - ei.y
+        d2 = dx*dx + dy*dy
+        if d2 < min_sep2 and d2 > 1e-4:
+            d = math.sqrt(d2)
+            push = (min_sep - d) * 0.5
+            nx, ny = dx/d, dy/d
+            ei.x -= nx*push; ei.y -= ny*push
+            ej.x += nx*push; ej.y += ny*push
+            bound(ei); bound(ej)
+            pushed.add(i); pushed.add(j)
+    for i in pushed:
+        e = enemies[i]
+        grid.move(i, e.x, e.y)
+
+TARGET_FOODS = 30
+N_ENEMIES = 14
+N_PLANTS = 25
+BUBBLE_CAP = 260
+BUBBLE_DRAW = 220   # newest bubbles the renderer draws; the rest are stepped lazily
+
+# Activity LOD: enemies further than the aggro range plus ACTIVE_MARGIN from
+# the hero only wander every WANDER_EVERY ticks, catching up on the time owed.
+# The margin is far more than one such batch of wandering, so an enemy is back
+# on per-tick steps well before it can start chasing.
+ACTIVE_MARGIN = 80.0
+WANDER_EVERY = 4
+
+ENEMY_AI = ("objects", "numpy")   # World(enemy_ai=...) backends
+MOVE_KEYS = ("w","a","s","d","q","e")
+
+# ---------------- World ----------------
+class World:
+    """Every piece of gameplay state, stepped at a fixed dt.
+
+    `time` is the world's own clock: it only moves when the world is stepped,
+    so food bobbing, spawn timers and damage cooldowns are independent of the
+    wall clock. All randomness comes from `rng`, seeded from `seed`, so a
+    seed plus the per-tick input stream reproduces a run exactly.
+
+    `input_source` is called once per tick and returns `(keys, events)`: the
+    movement keys held and a list of events (see apply_event). The default
+    source reads `keys_down`. Events queued with post() are added on top, and
+    `recorder`, if set, sees every tick's final keys and events.
+    """
+    def __init__(self, seed=None, input_source=None, target_foods=TARGET_FOODS,
+                 n_enemies=N_ENEMIES, n_plants=N_PLANTS, bubble_cap=BUBBLE_CAP,
+                 difficulty=1, speed_scale=None, aggro_range=None, enemy_ai="objects",
+                 flow=True):
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
+        self.input_source = input_source if input_source is not None else self.live_input
+        self.target_foods = target_foods
+        self.n_enemies = n_enemies
+        self.n_plants = n_plants
+        self.bubble_cap = bubble_cap
+        self.bubble_draw = BUBBLE_DRAW
+        self.bubble_limit = bubble_cap   # spawn cap; lowered by "quality" events
+        # Difficulty the world starts (and resets) on; speed_scale and
+        # aggro_range, when given, override that difficulty's table entries.
+        self.difficulty = difficulty
+        self.speed_scale = speed_scale
+        self.aggro_range = aggro_range
+        # "objects": an Enemy per fish; "numpy": one swarm.EnemySwarm for all of them
+        if enemy_ai not in ENEMY_AI:
+            raise ValueError(f"enemy_ai must be one of {ENEMY_AI}, not {enemy_ai!r}")
+        self.enemy_ai = enemy_ai
+        self.swarm = None
+        # Chasers follow a flow.FlowField around the bunker; flow=False steers straight.
+        self.flow = FlowField() if flow else None
+        self.keys_down = set()
+        self.events = deque()   # deque: post() may come from another thread
+        self.recorder = None
+        self.profiler = None   # profiler.Profiler while phase timing is on
+        self.generation = 0   # bumped on every reset so renderers can drop caches
+        self.sep_grid = SpatialHash(MIN_SEP)   # enemies, rebuilt every tick
+        self.food_grid = SpatialHash(FOOD_CELL)
+        self.food_pool = FoodPool()   # kept across resets
+        self.foods = []
+        self.bubbles = None
+        self.reset()
+
+    def config(self):
+        """Constructor arguments that, with the seed, define the starting world."""
+        return {"target_foods": self.target_foods, "n_enemies": self.n_enemies,
+                "n_plants": self.n_plants, "bubble_cap": self.bubble_cap,
+                "difficulty": self.difficulty, "speed_scale": self.speed_scale,
+                "aggro_range": self.aggro_range, "enemy_ai": self.enemy_ai,
+                "flow": self.flow is not None}
+
+    def reset(self):
+        rng = self.rng
+        self.generation += 1
+        self.hero = Hero()
+        if self.flow is not None:
+            self.flow.reset()
+        if self.enemy_ai == "numpy":
+            from swarm import EnemySwarm
+            self.swarm = EnemySwarm(self.n_enemies, np.random.default_rng(rng.getrandbits(64)))
+            self.enemies = self.swarm
+        else:
+            self.enemies = [Enemy(rng) for _ in range(self.n_enemies)]
+        pool, foods = self.food_pool, self.foods
+        for f in foods:
+            pool.give(f)
+        foods.clear()
+        for _ in range(self.target_foods):
+            foods.append(pool.take(rng))
+        self.food_grid.rebuild(foods)
+
+        self.plants = []
+        for _ in range(self.n_plants):
+            while True:
+                x = rng.uniform(-GRID_LENGTH*0.45, GRID_LENGTH*0.45)
+                y = rng.uniform(-GRID_LENGTH*0.45, GRID_LENGTH*0.45)
+                if (x-BUNKER_CENTER[0])**2 + (y-BUNKER_CENTER[1])**2 > (BUNKER_RADIUS+40)**2:
+                    self.plants.append(Plant(x,y,rng)); break
+
+        # Bubbles: a vectorised pool, see bubbles.py. Its NumPy generator is
+        # seeded from the world's rng so it replays too. The arrays are kept
+        # across resets.
+        brng = np.random.default_rng(rng.getrandbits(64))
+        if self.bubbles is None:
+            self.bubbles = BubblePool(self.bubble_cap, rng=brng, hot=self.bubble_draw)
+        else:
+            self.bubbles.reset(brng)
+        nrng = self.bubbles.rng
+        self.bubbles.spawn_many(nrng.uniform(-HALF*0.9, HALF*0.9, 60),
+                                nrng.uniform(-HALF*0.9, HALF*0.9, 60),
+                                nrng.uniform(4.0, 60.0, 60),
+                                source='random')
+        for p in self.plants:
+            self.bubbles.spawn_many(p.x + nrng.uniform(-6,6, 2),
+                                    p.y + nrng.uniform(-6,6, 2),
+                                    nrng.uniform(4.0, 16.0, 2),
+                                    source='plant', ox=p.x, oy=p.y)
+
+        self.bubbles.spawn_many(np.full(40, BUB_POS[0]), np.full(40, BUB_POS[1]),
+                                nrng.uniform(4.0, 12.0, 40),
+                                source='bubbler', ox=BUB_POS[0], oy=BUB_POS[1])
+        self.time = 0.0
+        self.accum = 0.0
+        self.ticks = 0
+        self.last_spawn_food = 0.0
+        self.diff_idx = self.difficulty
+        self.food_eaten = 0
+        self.damage_taken = 0
+
+    def add_food(self, f):
+        self.foods.append(f)
+        self.food_grid.insert(f.x, f.y)
+
+    def remove_food(self, i):
+        """O(1) swap-remove; the last food takes index i. Its record is recycled."""
+        foods = self.foods
+        self.food_pool.give(foods[i])
+        foods[i] = foods[-1]
+        foods.pop()
+        self.food_grid.swap_remove(i)
+
+    def live_input(self):
+        # A copy, since the window thread edits keys_down while we step.
+        return frozenset(self.keys_down), ()
+
+    def post(self, *event):
+        """Queue an event for the next tick, e.g. post("diff", 2)."""
+        self.events.append(event)
+
+    def apply_event(self, ev):
+        name = ev[0]
+        if name == "cheat":
+            self.hero.cheat = not self.hero.cheat
+        elif name == "diff":
+            self.diff_idx = int(ev[1])
+        elif name == "turn":
+            self.hero.yaw += float(ev[1])
+        elif name == "reset":
+            self.reset()
+        elif name == "quality":
+            # renderer's detail level: bubbles drawn (and stepped every tick), spawn cap
+            self.bubbles.catch_up()   # slots that turn hot start from the pool clock
+            self.bubble_draw = self.bubbles.hot = int(ev[1])
+            self.bubble_limit = min(int(ev[2]), self.bubble_cap)
+
+    def advance(self, frame_dt, max_ticks=None):
+        """Feed real elapsed time in; runs as many fixed ticks as fit.
+
+        With max_ticks, time owed beyond that many ticks is dropped, so
+        the game slows down rather than spending longer on the next frame.
+        """
+        self.accum += clamp(frame_dt, 0.0, MAX_FRAME_DT)
+        n = 0
+        while self.accum >= TICK_DT:
+            if n == max_ticks:
+                self.accum %= TICK_DT
+                break
+            self.step()
+            self.accum -= TICK_DT
+            n += 1
+        return n
+
+    def step(self, dt=TICK_DT):
+        prof = self.profiler
+        if prof: prof.start()
+        keys, events = self.input_source()
+        posted = self.events
+        if posted:
+            events = list(events)
+            while posted:
+                events.append(posted.popleft())
+        if self.recorder is not None:
+            self.recorder(keys, events)
+        for ev in events:
+            self.apply_event(ev)
+        if prof: prof.lap("input")
+        self.time += dt
+        self.ticks += 1
+        if self.hero.is_dead:
+            return
+        self.update(dt, keys)
+
+    def update_enemies(self, dt, aggro_r, diff_scale):
+        """Per-object enemy AI (enemy_ai="objects"), with activity LOD."""
+        hero, rng, flow = self.hero, self.rng, self.flow
+        aggro2 = aggro_r*aggro_r
+        active2 = (aggro_r + ACTIVE_MARGIN)**2
+        slot = self.ticks % WANDER_EVERY
+        for k, e in enumerate(self.enemies):
+            d2 = dist2(e.x, e.y, hero.x, hero.y)
+            if d2 > active2:
+                # Staggered by index so each tick wanders 1/WANDER_EVERY of them.
+                e.idle_dt += dt
+                if k % WANDER_EVERY == slot:
+                    e.wander(e.idle_dt, rng); e.idle_dt = 0.0
+                continue
+            if e.idle_dt:
+                e.wander(e.idle_dt, rng); e.idle_dt = 0.0
+            if d2 <= aggro2:
+                e.chase(hero, dt, diff_scale, flow)
+            else:
+                e.wander(dt, rng)
+
+    def enemies_near(self, x, y, r):
+        """Indices of enemies that may be within r of (x, y) on the xy plane."""
+        if self.swarm is not None:
+            return self.swarm.near(x, y, r)
+        return self.sep_grid.query(x, y, r)
+
+    def update(self, dt, keys):
+        hero, enemies, foods = self.hero, self.enemies, self.foods
+        rng = self.rng
+        prof = self.profiler
+        dx = dy = dz = 0.0
+        if "w" in keys: dy += 1.0
+        if "s" in keys: dy -= 1.0
+        if "a" in keys: dx -= 1.0
+        if "d" in keys: dx += 1.0
+        if "q" in keys: dz += 1.0
+        if "e" in keys: dz -= 1.0
+
+        if abs(dx) + abs(dy) > 0:
+            hero.yaw = math.degrees(math.atan2(dx, dy))
+
+        hero.move_dir(dx, dy, dt)
+        hero.move_vert(dz, dt)
+        if prof: prof.lap("hero")
+
+        diff_scale = self.speed_scale if self.speed_scale is not None else DIFF_SPEED_SCALE[self.diff_idx]
+        aggro_r = self.aggro_range if self.aggro_range is not None else DIFF_AGGRO_RANGE[self.diff_idx]
+        if self.flow is not None:
+            self.flow.update(hero.x, hero.y)
+            if prof: prof.lap("flow")
+        swarm = self.swarm
+        if swarm is not None:
+            swarm.think(hero, dt, aggro_r, diff_scale, self.flow)
+            if prof: prof.lap("enemy_ai")
+            swarm.separate(MIN_SEP)
+            if prof: prof.lap("separation")
+        else:
+            self.update_enemies(dt, aggro_r, diff_scale)
+            if prof: prof.lap("enemy_ai")
+            separate_enemies(enemies, MIN_SEP, self.sep_grid)
+            if prof: prof.lap("separation")
+
+        now = self.time
+        if len(foods) < self.target_foods and (now - self.last_spawn_food) > 0.25:
+            self.add_food(self.food_pool.take(rng)); self.last_spawn_food = now
+
+        # Only food in grid cells near the hero can be in reach.
+        eaten = []
+        for i in self.food_grid.query(hero.x, hero.y, hero.size*0.5 + FOOD_SIZE):
+            fx, fy, fz = foods[i].pos(now)
+            if dist3(hero.x, hero.y, hero.z, fx, fy, fz) < (hero.size*0.5 + foods[i].size):
+                eaten.append(i)
+        # Highest index first so a swap never moves a food still to be removed.
+        for i in sorted(eaten, reverse=True):
+            hero.health = min(hero.max_health, hero.health + 8)
+            self.food_eaten += 1
+            self.remove_food(i)
+        if prof: prof.lap("food")
+
+        # Damage from enemies (unless shield/bunker); sep_grid is current
+        # after separate_enemies.
+        safe = hero.cheat or hero_in_bunker(hero)
+        if not safe and (now - hero.last_dmg_time) > 0.35:
+            hit = False
+            if swarm is not None:
+                hit = swarm.touching(hero.x, hero.y, hero.z, hero.size*0.5)
+            else:
+                for i in self.sep_grid.query(hero.x, hero.y, hero.size*0.5 + ENEMY_SIZE*0.7):
+                    e = enemies[i]
+                    if dist3(hero.x, hero.y, hero.z, e.x, e.y, e.z) < (hero.size*0.5 + e.size*0.7):
+                        hit = True
+                        break
+            if hit:
+                hero.health -= 5
+                self.damage_taken += 5
+                hero.last_dmg_time = now
+        if hero.health <= 0:
+            hero.is_dead = True
+            hero.health = 0
+        if prof: prof.lap("collision")
+
+        bubbles = self.bubbles
+        bubbles.step(dt)
+        if rng.random() < 0.06 and len(bubbles) < self.bubble_limit:
+            bubbles.spawn(rng.uniform(-HALF*0.9, HALF*0.9),
+                          rng.uniform(-HALF*0.9, HALF*0.9),
+                          4.0 + rng.random()*20.0,
+                          source='random')
+        if rng.random() < 0.20 and len(bubbles) < self.bubble_limit:
+            bubbles.spawn(BUB_POS[0], BUB_POS[1], 6.0, source='bubbler', ox=BUB_POS[0], oy=BUB_POS[1])
+        if prof: prof.lap("bubbles")
+
+    def digest(self):
+        """Hash of the whole gameplay state; equal digests mean identical runs."""
+        h = hashlib.sha1()
+        hero = self.hero
+        h.update(repr((self.ticks, self.time, self.diff_idx, hero.x, hero.y, hero.z, hero.yaw,
+                       hero.health, hero.is_dead, hero.cheat, hero.last_dmg_time,
+                       self.last_spawn_food)).encode())
+        h.update(repr([(e.x, e.y, e.z, e.wander_dir, e.wander_timer, e.idle_dt)
+                       for e in self.enemies]).encode())
+        h.update(repr([(f.x, f.y, f.base_z, f.phase) for f in self.foods]).encode())
+        b = self.bubbles
+        for a in (b.x, b.y, b.z, b.v, b.r, b.phase, b.t):
+            h.update(a.tobytes())
+        return h.hexdigest()
+
+    def allocations(self):
+        """Entity records/arrays allocated so far; flat in steady state."""
+        return {"food": self.food_pool.allocations, "bubbles": self.bubbles.allocations}
+
+# ---------------- Headless run ----------------
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="Step the fish tank without a window.")
+    ap.add_argument("--ticks", type=int, default=60*60, help="number of fixed ticks to run")
+    ap.add_argument("--cheat", action="store_true", help="shield the hero so the run never ends early")
+    ap.add_argument("--foods", type=int, default=TARGET_FOODS, help="food pellets kept in the tank")
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--no-flow", action="store_true", help="chasers steer straight at the hero")
+    ap.add_argument("--load", metavar="PATH", help="resume from a savegame.py checkpoint")
+    ap.add_argument("--save", metavar="PATH", help="write a checkpoint after the run")
+    args = ap.parse_args(argv)
+
+    if args.load:
+        import savegame
+        w = savegame.load(args.load)
+    else:
+        w = World(seed=args.seed, target_foods=args.foods, flow=not args.no_flow)
+    w.hero.cheat = w.hero.cheat or args.cheat
+    allocs = w.allocations()
+    t0 = time.perf_counter()
+    for _ in range(args.ticks):
+        w.step()
+    el = time.perf_counter() - t0
+    grown = {k: v - allocs[k] for k, v in w.allocations().items()}
+    print(f"{args.ticks} ticks ({args.ticks*TICK_DT:.1f}s sim) in {el:.3f}s "
+          f"-> {args.ticks/max(el, 1e-9):.0f} ticks/s")
+    print(f"health={w.hero.health} dead={w.hero.is_dead} foods={len(w.foods)} bubbles={len(w.bubbles)}")
+    print(f"entity allocations during the run: {grown}")
+    print(f"seed={w.seed} tick={w.ticks} digest={w.digest()}")
+    if args.save:
+        import savegame
+        savegame.save(w, args.save)
+
+if __name__ == "__main__":
+    main()